@@ -1,6 +1,10 @@
+import os
 import pygame
 from src.game import Game
 from src.db.new.database import ChessDatabase
+from src.db.new.opening_index import OpeningIndex
+from src.db.new.compiled_openings import CompiledOpenings
+from src.ai.opening_book import OpeningBook
 
 r'''
 / ============================ 
@@ -31,6 +35,11 @@ def loadSettings(file_path):
                         value = value.lower() == "true"
                     elif value.isdigit():
                         value = int(value)
+                    else:
+                        try:
+                            value = float(value)  # Дробные значения, например bot_move_time=0.5
+                        except ValueError:
+                            pass
                     settings[key] = value
     except FileNotFoundError:
         print(f"Settings file not found: {file_path}. Using default settings.")
@@ -44,7 +53,22 @@ def main():
 
     # Подключение к базе данных
     db_path = settings.get("db_path", "data/openings/chess_openings.db")
-    chess_db = ChessDatabase(db_path)
+    compiled_path = os.path.splitext(db_path)[0] + '.compiled'
+    chess_db = None
+    if CompiledOpenings.is_current(compiled_path, db_path):
+        opening_index = CompiledOpenings(compiled_path)  # Скомпилированная база: без соединения с SQLite
+    else:
+        chess_db = ChessDatabase(db_path, read_only=True)  # Игра только читает базу
+        opening_index = OpeningIndex.load(chess_db)  # Названия дебютов в памяти (со снимком рядом с базой)
+
+    # Дебютная книга бота: линии базы дебютов и, если указана, книга Polyglot
+    opening_book = None
+    if settings.get("bot_book", True):
+        polyglot_path = settings.get("bot_book_path") or None
+        if chess_db is None:
+            opening_book = OpeningBook.from_lines(opening_index.lines(), polyglot_path=polyglot_path)
+        else:
+            opening_book = OpeningBook.from_database(chess_db, polyglot_path=polyglot_path)
     
     # Определение размеров окна
     if settings.get("window_autosize", True):  # Если авторазмер включен
@@ -60,19 +84,33 @@ def main():
         # Размер окна
         window_height=window_height,
         window_width=window_width,
+        max_fps=settings.get("max_fps", 60),          # Ограничение частоты кадров
+        show_fps=settings.get("show_fps", False),     # Частота кадров в заголовке окна
 
         # Настройки бота
         isBotOn=settings.get("isBotOn", False),       # Включить бота
         bot_depth=settings.get("bot_depth", 3),      # Глубина поиска бота
+        bot_hash_mb=settings.get("bot_hash_mb", 16), # Размер таблицы транспозиции (МБ)
+        bot_move_time=settings.get("bot_move_time", 5), # Время на ход бота (секунды)
+        bot_workers=settings.get("bot_workers", 1),   # Число процессов поиска (0 - все ядра)
+        bot_parallel_mode=settings.get("bot_parallel_mode", "lazy_smp"), # lazy_smp или root_split
+        bot_ponder=settings.get("bot_ponder", False), # Думать на времени игрока
+        bot_book=opening_book,                        # Дебютная книга
 
         # Отображение названия позиции
-        chess_db=chess_db,                           # Подключение к базе данных
+        chess_db=opening_index,                      # Индекс названий дебютов
         language=settings.get("language", 'EN')     # Язык интерфейса
     )
     game.run()
+    game.close()
     
-    # Закрытие базы данных
-    chess_db.close()
+    # Закрытие дебютной книги и базы данных
+    if opening_book is not None:
+        opening_book.close()
+    if chess_db is not None:
+        chess_db.close()
+    else:
+        opening_index.close()
     pygame.quit()
 
 if __name__ == '__main__':
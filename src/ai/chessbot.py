@@ -1,6 +1,16 @@
 import chess
 import math
+import os
+import random
+import threading
 import time
+from concurrent.futures import wait
+from src.ai.transposition import TranspositionTable, EXACT, LOWER, UPPER
+from src.ai.zobrist import zobrist_hash, piece_changes, push_with_key
+from src.ai.evaluation import Evaluator, MATE_SCORE
+from src.ai.see import see, captured_value
+from src.ai.move_ordering import MoveOrderer
+from src.ai.parallel import WorkerPool, lazy_smp_search, root_split_search
 
 r'''
 / ============================ \
@@ -10,12 +20,68 @@ r'''
 \ ============================ /
 '''
 
+class SearchAborted(Exception):
+    """Поиск прерван по истечении отведенного времени или по сигналу остановки."""
+
+
 class ChessBot:
-    def __init__(self, depth=3):
+    # Как часто (в узлах) проверять время внутри поиска
+    TIME_CHECK_INTERVAL = 256
+    # Сокращение глубины для нулевого хода
+    NULL_MOVE_REDUCTION = 2
+    # С какого по счету хода применяется сокращение поздних ходов
+    LMR_MIN_MOVES = 3
+    # После скольких расширений окно поиска становится бесконечным
+    ASPIRATION_MAX_RETRIES = 3
+    # Запас для delta-отсечения в форсированном поиске
+    DELTA_MARGIN = 200
+    # Насколько ниже оценки прошлого раунда ставится alpha при разделении ходов корня
+    ROOT_SPLIT_MARGIN = 50
+    # Как часто (в секундах) root_split проверяет сигнал остановки, пока ждет процессы
+    STOP_POLL_INTERVAL = 0.05
+
+    def __init__(self, depth=3, hash_size_mb=16, workers=1, parallel_mode='lazy_smp', seed=0,
+                 search_options=None, transposition_table=None, opening_book=None):
+        """
+        :param depth: Максимальная глубина поиска.
+        :param hash_size_mb: Размер таблицы транспозиции в мегабайтах.
+        :param workers: Число процессов поиска; 0 - по числу ядер.
+        :param parallel_mode: 'lazy_smp' (общая таблица) или 'root_split' (разделение ходов корня).
+        :param seed: Зерно для порядка ходов помощников Lazy SMP.
+        :param search_options: Включение приемов поиска, например {'lmr': False};
+                               доступны 'pvs', 'null_move', 'lmr' и 'quiescence' (по умолчанию все включены),
+                               а также 'aspiration_window' - полуширина окна вокруг оценки прошлой
+                               итерации (0 - без окна) и 'aspiration_growth' - во сколько раз окно
+                               расширяется после выхода оценки за его границу.
+        :param transposition_table: Готовая таблица (используется процессами-помощниками).
+        :param opening_book: OpeningBook; пока позиция в книге, ход берется из нее без поиска.
+        """
         self.depth = depth
+        self.workers = workers or os.cpu_count() or 1
+        self.parallel_mode = parallel_mode
+        self.seed = seed
+        self.options = {'pvs': True, 'null_move': True, 'lmr': True, 'quiescence': True,
+                        'aspiration_window': 50, 'aspiration_growth': 2}
+        self.options.update(search_options or {})
         self.position_history = set()  # Храним хэши позиций
-        self.transposition_table = {}  # Таблица транспозиции
-        self.killer_moves = {}         # Сохраняем хорошие ходы для каждой глубины
+        if transposition_table is None:
+            # При Lazy SMP таблица размещается в разделяемой памяти
+            shared = self.workers > 1 and parallel_mode == 'lazy_smp'
+            transposition_table = TranspositionTable(hash_size_mb, shared=shared)
+        self.transposition_table = transposition_table  # Таблица транспозиции
+        self.opening_book = opening_book  # Дебютная книга
+        self.move_orderer = MoveOrderer()  # Порядок ходов: killer-ходы и история
+        self.evaluator = Evaluator()   # Инкрементальная оценка для поиска
+        self.deadline = None           # Момент (time.monotonic), когда поиск должен прерваться
+        self.soft_deadline = None      # Момент, после которого не начинается новая итерация
+        self.ponderhit_time = None     # Лимит, заданный ponderhit до начала обдумывания
+        self.time_lock = threading.Lock()
+        self.root_best_move = None     # Лучший ход текущей итерации (в т.ч. незавершенной)
+        self.root_best_eval = None     # Его оценка
+        self.root_seed = None          # Зерно для перемешивания ходов в корне (помощники Lazy SMP)
+        self.stop_event = None         # Внешний сигнал остановки поиска
+        self.pool = None               # Пул процессов-помощников, создается при первом поиске
+        self.stats = {'nodes': 0}      # Статистика последнего поиска
 
     def center_control(self, board, color):
         """Оценка контроля центра (сильные квадраты)."""
@@ -102,6 +168,10 @@ class ChessBot:
         return control
 
     def evaluate_board(self, board):
+        """
+        Полная оценка позиции с точки зрения белых.
+        В поиске используется эквивалентный и более быстрый self.evaluator.
+        """
         if board.is_checkmate():
             return -9999 if board.turn else 9999
         if board.is_stalemate() or board.is_insufficient_material():
@@ -224,123 +294,512 @@ class ChessBot:
         board.pop()
         return is_threatening
 
-    def sort_moves(self, board, moves, killer_moves, depth):
-        def move_priority(move):
-            score = 0
-            piece = board.piece_at(move.from_square)
-
-            # Штраф за ферзя в центре
-            center_squares = [chess.D4, chess.E4, chess.D5, chess.E5]
-            if piece and piece.piece_type == chess.QUEEN and move.to_square in center_squares:
-                score -= 2000  # Повторяем штраф в сортировке
+    def sort_moves(self, board, moves, ply=0, hash_move=None):
+        """Сортирует ходы: лучший ход из таблицы, взятия (MVV-LVA), превращения, killer-ходы, история."""
+        return self.move_orderer.order(board, moves, ply, hash_move)
 
-            # Приоритет хода пешек в центр
-            if piece and piece.piece_type == chess.PAWN and move.to_square in center_squares:
-                score += 300
-
-            # Приоритет развития лёгких фигур
-            developed_positions = [chess.C3, chess.F3, chess.C6, chess.F6, chess.C4, chess.F4, chess.C5, chess.F5]
-            if piece and piece.piece_type in [chess.KNIGHT, chess.BISHOP] and move.to_square in developed_positions:
-                score += 200
-
-            # Захват фигуры
-            if board.is_capture(move):
-                captured_piece = board.piece_at(move.to_square)
-                if captured_piece:
-                    score += 1000 + captured_piece.piece_type * 100
+    def store_transposition(self, key, depth, eval, best_move, flag=EXACT):
+        """
+        Сохраняет позицию в таблице транспозиции.
+        """
+        self.transposition_table.store(key, depth, eval, flag, best_move)
 
-            return score
+    def make_move(self, board, key, move):
+        """Делает ход в поиске, обновляя оценку и ключ позиции. Возвращает новый ключ."""
+        changes = piece_changes(board, move)
+        self.evaluator.push(changes)
+        return push_with_key(board, key, move, changes)
 
-        return sorted(moves, key=move_priority, reverse=True)
+    def unmake_move(self, board):
+        """Отменяет ход, сделанный make_move."""
+        board.pop()
+        self.evaluator.pop()
 
-    def store_transposition(self, board_fen, depth, eval, best_move):
+    def minimax(self, board, depth, alpha, beta, maximizing_player, previous_best_move=None, key=None, ply=0):
         """
-        Сохраняет позицию в таблице транспозиции.
+        Поиск с точки зрения белых: обертка над negamax, сохраняющая прежний интерфейс.
+        :return: (оценка с точки зрения белых, лучший ход).
         """
-        self.transposition_table[board_fen] = {
-            'eval': eval,
-            'depth': depth,
-            'best_move': best_move
-        }
-
-    def minimax(self, board, depth, alpha, beta, maximizing_player, previous_best_move=None):
+        if key is None:
+            # Вызов извне поиска: синхронизируем ключ и оценку с доской
+            key = zobrist_hash(board)
+            self.evaluator.reset(board)
+
+        if board.turn == chess.WHITE:
+            eval, move = self.negamax(board, depth, alpha, beta, key, ply, previous_best_move)
+            return eval, move
+        eval, move = self.negamax(board, depth, -beta, -alpha, key, ply, previous_best_move)
+        return -eval, move
+
+    def negamax(self, board, depth, alpha, beta, key, ply=0, previous_best_move=None, allow_null=True):
         """
-        Реализация минимакса с альфа-бета отсечением и использованием транспозиционной таблицы.
+        Negamax с альфа-бета отсечением, таблицей транспозиции, поиском с нулевым
+        окном (PVS), нулевым ходом и сокращением поздних ходов (LMR).
+        Оценки даются с точки зрения стороны, которая ходит.
+        Каждые TIME_CHECK_INTERVAL узлов проверяет время и сигнал остановки
+        и при необходимости выбрасывает SearchAborted.
+        :return: (оценка, лучший ход).
         """
-        board_fen = board.fen()
+        self.stats['nodes'] += 1
+        if self.stats['nodes'] % self.TIME_CHECK_INTERVAL == 0 and self.should_stop():
+            raise SearchAborted()
+
+        if ply > 0 and (board.is_seventyfive_moves() or board.is_fivefold_repetition()):
+            return 0, None
+
+        alpha_orig = alpha
 
         # Проверяем транспозиционную таблицу
-        if board_fen in self.transposition_table:
-            transposition = self.transposition_table[board_fen]
-            if transposition['depth'] >= depth:
-                return transposition['eval'], transposition.get('best_move')
-
-        # Проверка на окончание игры или максимальную глубину
-        if depth == 0 or board.is_game_over():
-            eval = self.evaluate_board(board)
-            self.store_transposition(board_fen, depth, eval, None)
+        hash_move = previous_best_move
+        transposition = self.transposition_table.probe(key)
+        if transposition is not None:
+            tt_eval, tt_depth, tt_flag, tt_move = transposition
+            if tt_depth >= depth and ply > 0:
+                if tt_flag == EXACT or (tt_flag == LOWER and tt_eval >= beta) or (tt_flag == UPPER and tt_eval <= alpha):
+                    return tt_eval, tt_move
+            if tt_move is not None:
+                hash_move = tt_move
+
+        if depth <= 0 and self.options['quiescence']:
+            eval = self.quiescence(board, alpha, beta, key, ply)
+            if eval <= alpha_orig:
+                flag = UPPER
+            elif eval >= beta:
+                flag = LOWER
+            else:
+                flag = EXACT
+            self.store_transposition(key, 0, eval, None, flag)
+            return eval, None
+
+        if depth <= 0:
+            eval = self.evaluator.evaluate(board)
+            eval = eval if board.turn == chess.WHITE else -eval
+            self.store_transposition(key, 0, eval, None)
             return eval, None
 
-        best_move = None
         moves = list(board.legal_moves)
+        if not moves:
+            # Мат или пат
+            eval = self.evaluator.evaluate(board)
+            return (eval if board.turn == chess.WHITE else -eval), None
+
+        in_check = board.is_check()
+
+        # Нулевой ход: если даже пропуск хода дает оценку не ниже beta, позиция отсекается.
+        # Не применяется под шахом и без фигур (только пешки и король), где возможен цугцванг.
+        if self.options['null_move'] and allow_null and ply > 0 and depth > self.NULL_MOVE_REDUCTION \
+                and not in_check and abs(beta) < MATE_SCORE \
+                and board.occupied_co[board.turn] & ~(board.pawns | board.kings):
+            null_key = self.make_move(board, key, chess.Move.null())
+            try:
+                eval, _ = self.negamax(board, depth - 1 - self.NULL_MOVE_REDUCTION, -beta, -beta + 1,
+                                       null_key, ply + 1, allow_null=False)
+            finally:
+                self.unmake_move(board)
+            if -eval >= beta:
+                self.stats['null_cutoffs'] = self.stats.get('null_cutoffs', 0) + 1
+                return beta, None
+
+        # Лучший ход из таблицы или предыдущей итерации проверяем первым
+        moves = self.sort_moves(board, moves, ply, hash_move)
+
+        # Помощники Lazy SMP перебирают остальные ходы корня в своем порядке
+        if ply == 0 and self.root_seed is not None:
+            rest = moves[1:]
+            random.Random(self.root_seed * 1000 + depth).shuffle(rest)
+            moves[1:] = rest
+
+        best_eval, best_move = -math.inf, None
+        for index, move in enumerate(moves):
+            # Сокращаем поздние тихие ходы: порядок ходов считает их слабыми
+            reduction = 0
+            if self.options['lmr'] and index >= self.LMR_MIN_MOVES and depth >= 3 and not in_check \
+                    and not move.promotion and not board.is_capture(move) and not board.gives_check(move):
+                reduction = 2 if index >= 2 * self.LMR_MIN_MOVES and depth >= 4 else 1
+
+            child_key = self.make_move(board, key, move)
+            try:
+                if index == 0 or not self.options['pvs']:
+                    eval = -self.negamax(board, depth - 1 - reduction, -beta, -alpha, child_key, ply + 1)[0]
+                    if reduction and eval > alpha:
+                        eval = -self.negamax(board, depth - 1, -beta, -alpha, child_key, ply + 1)[0]
+                else:
+                    # Проверка с нулевым окном; при успехе - повторный поиск с полным окном
+                    eval = -self.negamax(board, depth - 1 - reduction, -alpha - 1, -alpha, child_key, ply + 1)[0]
+                    if eval > alpha and reduction:
+                        eval = -self.negamax(board, depth - 1, -alpha - 1, -alpha, child_key, ply + 1)[0]
+                    if alpha < eval < beta:
+                        self.stats['pvs_researches'] = self.stats.get('pvs_researches', 0) + 1
+                        eval = -self.negamax(board, depth - 1, -beta, -alpha, child_key, ply + 1)[0]
+            finally:
+                self.unmake_move(board)
+
+            if eval > best_eval:
+                best_eval, best_move = eval, move
+                if ply == 0 and eval > alpha_orig:
+                    # Ход корня, не провалившийся ниже окна, годится как результат прерванного поиска
+                    self.root_best_move = move
+                    self.root_best_eval = eval if board.turn == chess.WHITE else -eval
+
+            alpha = max(alpha, eval)
+            if alpha >= beta:
+                # Запоминаем ход как "убийственный" и в истории
+                self.move_orderer.record_cutoff(board, move, ply, depth, index)
+                break
+
+        # Сохраняем в таблицу транспозиции с типом оценки
+        if best_eval <= alpha_orig:
+            flag = UPPER
+        elif best_eval >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.store_transposition(key, depth, best_eval, best_move, flag)
+        return best_eval, best_move
+
+    def quiescence(self, board, alpha, beta, key, ply):
+        """
+        Форсированный поиск на горизонте: только взятия и превращения (под шахом - все ходы).
+        Сторона может остановиться на статической оценке (stand pat); взятия, которые
+        даже с запасом DELTA_MARGIN не поднимают alpha или проигрывают размен (SEE < 0),
+        не рассматриваются. Оценка с точки зрения стороны, которая ходит.
+        """
+        self.stats['nodes'] += 1
+        self.stats['qnodes'] = self.stats.get('qnodes', 0) + 1
+        if self.stats['nodes'] % self.TIME_CHECK_INTERVAL == 0 and self.should_stop():
+            raise SearchAborted()
+
+        in_check = board.is_check()
+        if in_check:
+            moves = list(board.legal_moves)
+            if not moves:
+                return -MATE_SCORE
+            stand_pat = -math.inf
+        else:
+            stand_pat = self.evaluator.evaluate(board)
+            if board.turn == chess.BLACK:
+                stand_pat = -stand_pat
+            if stand_pat >= beta:
+                return stand_pat
+            alpha = max(alpha, stand_pat)
+            moves = [move for move in board.generate_legal_moves()
+                     if move.promotion or board.is_capture(move)]
+            if not moves:
+                return stand_pat
+
+        # Сначала самые ценные жертвы, затем самые дешевые нападающие
+        moves = self.sort_moves(board, moves, ply)
+
+        best_eval = stand_pat
+        for move in moves:
+            if not in_check and not move.promotion:
+                if stand_pat + captured_value(board, move) + self.DELTA_MARGIN <= alpha:
+                    self.stats['delta_pruned'] = self.stats.get('delta_pruned', 0) + 1
+                    continue
+                if see(board, move) < 0:
+                    self.stats['see_pruned'] = self.stats.get('see_pruned', 0) + 1
+                    continue
+
+            child_key = self.make_move(board, key, move)
+            try:
+                eval = -self.quiescence(board, -beta, -alpha, child_key, ply + 1)
+            finally:
+                self.unmake_move(board)
+
+            if eval > best_eval:
+                best_eval = eval
+            alpha = max(alpha, eval)
+            if alpha >= beta:
+                break
+
+        return best_eval
+
+    def set_time_limit(self, max_time, start_time=None):
+        """
+        Задает время на поиск. Новая итерация не начинается после половины этого
+        времени, текущая прерывается по его истечении. None - без ограничения.
+        Можно вызывать из другого потока во время поиска (ponderhit).
+        """
+        if max_time is None:
+            self.deadline = self.soft_deadline = None
+            return
+        start_time = time.monotonic() if start_time is None else start_time
+        self.soft_deadline = start_time + max_time / 2
+        self.deadline = start_time + max_time
+
+    def ponderhit(self, max_time):
+        """Соперник сыграл ожидаемый ход: поиск без ограничения времени продолжается с лимитом max_time."""
+        with self.time_lock:
+            self.ponderhit_time = max_time
+            self.set_time_limit(max_time)
+
+    def should_stop(self):
+        """Истекло ли время или пришел сигнал остановки."""
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return True
+        return self.stop_event is not None and self.stop_event.is_set()
+
+    def iterative_deepening(self, board, max_time, start_depth=1, max_depth=None, root_seed=None):
+        """
+        Итеративное углубление с контролем времени.
+        :return: (ход, оценка, глубина последней завершенной итерации). Если итерация
+                 прервана, но в ней уже найден ход, возвращаются её ход и оценка.
+        """
+        start_time = time.monotonic()
+        with self.time_lock:
+            # Обдумывание, которое ponderhit застал еще не начавшимся, сразу получает лимит
+            self.set_time_limit(max_time if max_time is not None else self.ponderhit_time, start_time)
+        self.root_seed = root_seed
+        self.stats = {'nodes': 0, 'depth': 0, 'aborted': False,
+                      'aspiration_fail_high': 0, 'aspiration_fail_low': 0}
+        self.move_orderer.new_search()
+
+        # Ищем на копии: прерванный поиск оставляет доску посреди варианта
+        board = board.copy()
+        key = zobrist_hash(board)
+        sign = 1 if board.turn == chess.WHITE else -1
+        best_move, best_eval = None, None
+
+        try:
+            for depth in range(start_depth, (max_depth or self.depth) + 1):
+                # Следующая итерация обычно дольше всех предыдущих вместе взятых
+                if depth > start_depth and self.soft_deadline is not None \
+                        and time.monotonic() > self.soft_deadline:
+                    break
+                self.root_best_move = None
+                eval, move = self.aspiration_search(board, depth, key, best_move,
+                                                    sign * best_eval if best_eval is not None else None)
+                if move:
+                    best_move, best_eval = move, sign * eval
+                self.stats['depth'] = depth
+        except SearchAborted:
+            self.stats['aborted'] = True
+            if self.root_best_move is not None:
+                best_move, best_eval = self.root_best_move, self.root_best_eval
+        finally:
+            self.deadline = self.soft_deadline = None
+            self.root_seed = None
+
+        if best_move is None:
+            best_move = next(iter(board.legal_moves), None)
+
+        self.stats['time'] = time.monotonic() - start_time
+        self.stats['first_move_cutoff_rate'] = self.move_orderer.first_move_cutoff_rate()
+        return best_move, best_eval, self.stats['depth']
+
+    def aspiration_search(self, board, depth, key, previous_move, previous_eval):
+        """
+        Поиск корня с окном вокруг оценки прошлой итерации (с точки зрения ходящей стороны).
+        Если оценка выходит за окно, оно расширяется в aspiration_growth раз на провалившейся
+        стороне, а после ASPIRATION_MAX_RETRIES расширений становится бесконечным.
+        :return: (оценка с точки зрения ходящей стороны, лучший ход).
+        """
+        window = self.options['aspiration_window']
+        if not window or previous_eval is None or abs(previous_eval) >= MATE_SCORE:
+            self.evaluator.reset(board)
+            return self.negamax(board, depth, -math.inf, math.inf, key, 0, previous_move)
+
+        low = high = window
+        retries = 0
+        while True:
+            alpha = previous_eval - low if low is not None else -math.inf
+            beta = previous_eval + high if high is not None else math.inf
+            self.evaluator.reset(board)
+            eval, move = self.negamax(board, depth, alpha, beta, key, 0, previous_move)
+
+            retries += 1
+            if eval <= alpha:
+                self.stats['aspiration_fail_low'] += 1
+                low = low * self.options['aspiration_growth'] if retries < self.ASPIRATION_MAX_RETRIES else None
+            elif eval >= beta:
+                self.stats['aspiration_fail_high'] += 1
+                high = high * self.options['aspiration_growth'] if retries < self.ASPIRATION_MAX_RETRIES else None
+                previous_move = move or previous_move
+            else:
+                return eval, move
+
+    def find_best_move(self, board, max_time=5, time_control=None):
+        """
+        Поиск лучшего хода.
+        :param board: Текущая позиция (не изменяется).
+        :param max_time: Время на ход в секундах; None - без ограничения (обдумывание
+                         на времени соперника до сигнала остановки или ponderhit).
+        :param time_control: TimeControl; если задан, время на ход берется из него.
+        """
+        if self.opening_book is not None:
+            book_move = self.opening_book.choose(board)
+            if book_move is not None:
+                self.stats = {'nodes': 0, 'book': True}
+                return book_move
 
-        # Сортируем ходы
-        if previous_best_move and previous_best_move in moves:
-            # Проверяем лучший ход из предыдущей итерации первым
-            moves.insert(0, moves.pop(moves.index(previous_best_move)))
+        if time_control is not None:
+            max_time = time_control.allocate(board)
+        self.transposition_table.new_search()
 
-        moves = self.sort_moves(board, moves, self.killer_moves, depth)
+        if self.workers > 1 and self.parallel_mode == 'root_split':
+            return self.root_split(board, max_time)
+        if self.workers > 1:
+            return self.lazy_smp(board, max_time)
 
-        if maximizing_player:
-            max_eval = -math.inf
-            for move in moves:
-                board.push(move)
-                eval, _ = self.minimax(board, depth - 1, alpha, beta, False, best_move)
-                board.pop()
+        move, _, _ = self.iterative_deepening(board, max_time)
+        return move
 
-                if eval > max_eval:
-                    max_eval = eval
-                    best_move = move
+    def lazy_smp(self, board, max_time):
+        """
+        Параллельный поиск Lazy SMP: помощники в отдельных процессах ищут ту же
+        позицию с другим порядком ходов и глубиной, заполняя общую таблицу
+        транспозиции. Берется результат самой глубокой завершенной итерации.
+        """
+        if self.pool is None:
+            self.pool = WorkerPool(self.workers - 1, self.depth, self.transposition_table)
+        self.pool.stop_event.clear()
+
+        futures = [self.pool.submit(lazy_smp_search, board, max_time, self.transposition_table.age,
+                                    self.seed * self.workers + index)
+                   for index in range(1, self.workers)]
+        try:
+            move, eval, depth = self.iterative_deepening(board, max_time)
+        finally:
+            # Основной поиск закончен: останавливаем помощников
+            self.pool.stop_event.set()
+
+        results = [(depth, eval, move, self.stats['nodes'])] + [future.result() for future in futures]
+        self.stats['nodes'] = sum(result[3] for result in results)
+        self.stats['helper_depths'] = [result[0] for result in results[1:]]
+
+        best = results[0]
+        for result in results[1:]:
+            if result[2] is not None and result[0] > best[0]:
+                best = result
+        self.stats['depth'] = best[0]
+        return best[2]
+
+    def principal_variation(self, board, max_length):
+        """Главный вариант из таблицы транспозиции, начиная с позиции board."""
+        board = board.copy(stack=False)
+        key = zobrist_hash(board)
+        pv, seen = [], set()
+        while len(pv) < max_length and key not in seen:
+            seen.add(key)
+            entry = self.transposition_table.probe(key)
+            if entry is None or entry[3] is None or not board.is_legal(entry[3]):
+                break
+            pv.append(entry[3])
+            key = push_with_key(board, key, entry[3])
+        return pv
 
-                alpha = max(alpha, eval)
-                if alpha >= beta:
-                    # Сохраняем "убийственный" ход
-                    self.killer_moves.setdefault(depth, []).append(move)
+    def search_root_moves(self, board, moves, depth, alpha=-math.inf):
+        """
+        Оценивает указанные ходы корня на глубину depth.
+        :param alpha: Нижняя граница с точки зрения стороны, которая ходит;
+                      ходы хуже неё получают лишь верхнюю оценку.
+        :return: Список (ход, оценка с точки зрения ходящей стороны, главный вариант).
+        """
+        sign = 1 if board.turn == chess.WHITE else -1
+        key = zobrist_hash(board)
+        self.evaluator.reset(board)
+        results = []
+        for move in moves:
+            child_key = self.make_move(board, key, move)
+            if sign > 0:
+                eval, _ = self.minimax(board, depth - 1, alpha, math.inf, False, None, child_key, 1)
+            else:
+                eval, _ = self.minimax(board, depth - 1, -math.inf, -alpha, True, None, child_key, 1)
+            pv = [move] + self.principal_variation(board, depth - 1)
+            self.unmake_move(board)
+
+            score = sign * eval
+            results.append((move, score, pv))
+            alpha = max(alpha, score)
+        return results
+
+    def root_split(self, board, max_time):
+        """
+        Параллельный поиск с разделением ходов корня: в каждом раунде (глубине)
+        ходы раздаются процессам пула по кругу в порядке оценок прошлого раунда.
+        Оценка лучшего хода прошлого раунда за вычетом ROOT_SPLIT_MARGIN служит alpha
+        для всех процессов; если ни один ход её не достиг, раунд повторяется с полным окном.
+        Время ограничивается так же, как в iterative_deepening (set_time_limit), поэтому
+        обдумывание без лимита получает его через ponderhit.
+        При поиске без ограничения по времени результат детерминирован, но за счет скорости:
+        каждая задача процесса начинается с пустой таблицей (см. root_split_search).
+        """
+        if self.pool is None:
+            self.pool = WorkerPool(self.workers, self.depth, self.transposition_table, shared=False)
+        self.pool.stop_event.clear()
+
+        start_time = time.monotonic()
+        with self.time_lock:
+            self.set_time_limit(max_time if max_time is not None else self.ponderhit_time, start_time)
+        self.stats = {'nodes': 0, 'depth': 0, 'aborted': False, 'pv': []}
+        self.move_orderer.new_search()
+        moves = self.sort_moves(board, list(board.legal_moves))
+        best_move, best_score = (moves[0] if moves else None), None
+
+        try:
+            for depth in range(1, self.depth + 1):
+                if depth > 1 and self.soft_deadline is not None and time.monotonic() > self.soft_deadline:
+                    break
+                if self.should_stop():
+                    self.stats['aborted'] = True
                     break
 
-            # Сохраняем в таблицу транспозиции
-            self.store_transposition(board_fen, depth, max_eval, best_move)
-            return max_eval, best_move
-        else:
-            min_eval = math.inf
-            for move in moves:
-                board.push(move)
-                eval, _ = self.minimax(board, depth - 1, alpha, beta, True, best_move)
-                board.pop()
-
-                if eval < min_eval:
-                    min_eval = eval
-                    best_move = move
-
-                beta = min(beta, eval)
-                if beta <= alpha:
-                    self.killer_moves.setdefault(depth, []).append(move)
+                alpha = best_score - self.ROOT_SPLIT_MARGIN if best_score is not None else -math.inf
+                results = self.run_root_round(board, moves, depth, alpha)
+                if results is not None and max(score for _, score, _ in results) <= alpha:
+                    # Все ходы хуже ожидаемого: повторяем раунд с полным окном
+                    results = self.run_root_round(board, moves, depth, -math.inf)
+                if results is None:
+                    self.stats['aborted'] = True
                     break
 
-            # Сохраняем в таблицу транспозиции
-            self.store_transposition(board_fen, depth, min_eval, best_move)
-            return min_eval, best_move
+                # Сортировка устойчива: при равных оценках сохраняется порядок прошлого раунда
+                results.sort(key=lambda result: result[1], reverse=True)
+                moves = [move for move, _, _ in results]
+                best_move, best_score, self.stats['pv'] = results[0]
+                self.stats['depth'] = depth
+        finally:
+            self.deadline = self.soft_deadline = None
 
-    def find_best_move(self, board, max_time=5):
-        start_time = time.time()
-        best_move = None
+        self.stats['time'] = time.monotonic() - start_time
+        return best_move
 
-        for depth in range(1, self.depth + 1):
-            if time.time() - start_time > max_time:
+    def run_root_round(self, board, moves, depth, alpha):
+        """
+        Один раунд root_split. Возвращает результаты в порядке moves или None, если раунд прерван.
+        Процессы получают оставшееся до deadline время; если лимит появился или сдвинулся
+        во время раунда (ponderhit), его истечение передается им через stop_event пула.
+        """
+        workers = self.pool.workers
+        chunks = [moves[index::workers] for index in range(workers)]
+        max_time = None if self.deadline is None else max(self.deadline - time.monotonic(), 0)
+        futures = [self.pool.submit(root_split_search, board, chunk, depth, alpha, max_time)
+                   for chunk in chunks if chunk]
+
+        # Ожидая процессы, следим за сигналом остановки и передаем его в пул
+        pending = futures
+        while pending:
+            _, pending = wait(pending, timeout=self.STOP_POLL_INTERVAL)
+            if pending and self.should_stop():
+                self.pool.stop_event.set()
                 break
-            _, move = self.minimax(board, depth, -math.inf, math.inf, board.turn,
-                                   best_move if best_move in board.legal_moves else None)
-            if move:
-                best_move = move
 
-        return best_move
+        by_move = {}
+        aborted = False
+        for future in futures:
+            results, nodes = future.result()
+            self.stats['nodes'] += nodes
+            if results is None:
+                aborted = True
+            else:
+                by_move.update((move, (move, score, pv)) for move, score, pv in results)
+        if aborted:
+            return None
+        return [by_move[move] for move in moves]
+
+    def close(self):
+        """Останавливает процессы-помощники и освобождает общую таблицу."""
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+        self.transposition_table.close()
@@ -0,0 +1,234 @@
+import chess
+from collections import OrderedDict
+
+r'''
+/ ============================ \
+
+      INCREMENTAL EVALUATION
+
+\ ============================ /
+'''
+
+# Оценка мата
+MATE_SCORE = 9999
+
+PIECE_VALUES = {
+    chess.PAWN: 100,
+    chess.KNIGHT: 320,
+    chess.BISHOP: 330,
+    chess.ROOK: 500,
+    chess.QUEEN: 900,
+    chess.KING: 10000
+}
+
+# Маски полей, используемые в оценке
+BB_CENTER = chess.BB_D4 | chess.BB_E4 | chess.BB_D5 | chess.BB_E5
+BB_DEVELOPED_KNIGHTS = chess.BB_C3 | chess.BB_F3 | chess.BB_C6 | chess.BB_F6
+BB_DEVELOPED_BISHOPS = chess.BB_C4 | chess.BB_F4 | chess.BB_C5 | chess.BB_F5
+BB_START_KNIGHTS = chess.BB_B1 | chess.BB_G1 | chess.BB_B8 | chess.BB_G8
+BB_START_BISHOPS = chess.BB_C1 | chess.BB_F1 | chess.BB_C8 | chess.BB_F8
+BB_QUEEN_EARLY = chess.BB_RANK_1 | chess.BB_RANK_2 | chess.BB_RANK_3 | chess.BB_RANK_6 | chess.BB_RANK_7 | chess.BB_RANK_8
+BB_KING_HOME = [chess.BB_E8, chess.BB_E1]
+
+
+def _build_piece_square_table():
+    """
+    Таблица "материал + развитие" для каждой фигуры на каждом поле
+    (со знаком: плюс для белых, минус для черных).
+    """
+    table = {}
+    for color in chess.COLORS:
+        sign = 1 if color == chess.WHITE else -1
+        for piece_type in chess.PIECE_TYPES:
+            values = []
+            for square in chess.SQUARES:
+                value = PIECE_VALUES[piece_type]
+                rank = chess.square_rank(square)
+                developed = rank >= 2 if color == chess.WHITE else rank <= 5
+                if developed and piece_type == chess.KNIGHT:
+                    value += 30
+                elif developed and piece_type == chess.BISHOP:
+                    value += 20
+                values.append(sign * value)
+            table[(piece_type, color)] = values
+    return table
+
+
+PIECE_SQUARE_TABLE = _build_piece_square_table()
+
+
+def pawn_structure_score(white_pawns, black_pawns):
+    """Оценка пешечной структуры (острова, изолированные и удвоенные пешки) по битбордам пешек."""
+    return (pawn_structure_penalty(black_pawns) - pawn_structure_penalty(white_pawns))
+
+
+def pawn_structure_penalty(pawns):
+    files = 0
+    doubled = 0
+    for file, mask in enumerate(chess.BB_FILES):
+        on_file = pawns & mask
+        if on_file:
+            files |= 1 << file
+            if on_file & (on_file - 1):
+                doubled += 1
+    islands = chess.popcount(files & ~(files << 1))
+    # Исходная оценка считает изолированной каждую пешку (сравнение Piece с типом фигуры
+    # в calculate_isolated_pawns никогда не истинно), поэтому штраф берется со всех пешек
+    isolated = chess.popcount(pawns)
+    return 20 * islands + 15 * isolated + 10 * doubled
+
+
+class PawnHashTable:
+    """
+    Кэш оценки пешечной структуры по паре битбордов пешек.
+    При переполнении вытесняется давно не использованная запись.
+    """
+
+    def __init__(self, max_entries=16384):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, white_pawns, black_pawns):
+        """Возвращает оценку пешечной структуры, вычисляя её только при промахе."""
+        key = (white_pawns, black_pawns)
+        score = self.entries.get(key)
+        if score is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return score
+
+        self.misses += 1
+        score = pawn_structure_score(white_pawns, black_pawns)
+        self.entries[key] = score
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return score
+
+    def hit_rate(self):
+        """Доля попаданий в кэш."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+class Evaluator:
+    """
+    Оценка позиции с инкрементальным учетом материала, развития фигур
+    и пешечной структуры. Остальные слагаемые считаются битбордами.
+    Дает те же значения, что и ChessBot.evaluate_board.
+    """
+
+    def __init__(self, pawn_hash_entries=16384):
+        self.piece_square = 0
+        self.pawn_structure = 0
+        self.stack = []
+        self.pawn_hash = PawnHashTable(pawn_hash_entries)
+
+    def reset(self, board):
+        """Полностью пересчитывает инкрементальные слагаемые для позиции."""
+        self.stack = []
+        self.piece_square = 0
+        for square, piece in board.piece_map().items():
+            self.piece_square += PIECE_SQUARE_TABLE[(piece.piece_type, piece.color)][square]
+        self.pawn_structure = self.compute_pawn_structure(board)
+
+    def compute_pawn_structure(self, board):
+        return self.pawn_hash.get(board.pawns & board.occupied_co[chess.WHITE],
+                                  board.pawns & board.occupied_co[chess.BLACK])
+
+    def push(self, changes):
+        """Обновляет слагаемые по изменениям хода (zobrist.piece_changes) до хода на доске."""
+        self.stack.append((self.piece_square, self.pawn_structure))
+        removed, added = changes
+        pawns_changed = False
+        for piece_type, color, square in removed:
+            self.piece_square -= PIECE_SQUARE_TABLE[(piece_type, color)][square]
+            pawns_changed = pawns_changed or piece_type == chess.PAWN
+        for piece_type, color, square in added:
+            self.piece_square += PIECE_SQUARE_TABLE[(piece_type, color)][square]
+            pawns_changed = pawns_changed or piece_type == chess.PAWN
+        # Пешечную структуру пересчитываем только после хода пешкой или её взятия
+        self.pawn_structure = None if pawns_changed else self.pawn_structure
+
+    def pop(self):
+        """Восстанавливает слагаемые после отмены хода."""
+        self.piece_square, self.pawn_structure = self.stack.pop()
+
+    def attacked_squares(self, board, color):
+        """Битборд всех полей, атакованных фигурами указанного цвета."""
+        own = board.occupied_co[color]
+        pawns = board.pawns & own
+        if color == chess.WHITE:
+            attacks = chess.shift_up_left(pawns) | chess.shift_up_right(pawns)
+        else:
+            attacks = chess.shift_down_left(pawns) | chess.shift_down_right(pawns)
+        for square in chess.scan_forward(own & ~pawns):
+            attacks |= board.attacks_mask(square)
+        return attacks
+
+    def open_lines(self, board, color):
+        """Оценка ладей на открытых и полуоткрытых вертикалях."""
+        rooks = board.rooks & board.occupied_co[color]
+        if not rooks:
+            return 0
+        enemy_pawns = board.pawns & board.occupied_co[not color]
+        score = 0
+        for mask in chess.BB_FILES:
+            rooks_on_file = rooks & mask
+            if not rooks_on_file:
+                continue
+            if not board.pawns & mask:
+                score += 20 * chess.popcount(rooks_on_file)
+            elif enemy_pawns & mask:
+                score += 10 * chess.popcount(rooks_on_file)
+        return score
+
+    def opening_principles(self, board, color):
+        """Дебютные принципы (то же, что ChessBot.evaluate_opening_principles)."""
+        own = board.occupied_co[color]
+        score = 50 * chess.popcount(board.pawns & own & BB_CENTER)
+        score += 30 * chess.popcount(board.knights & own & BB_DEVELOPED_KNIGHTS)
+        score += 30 * chess.popcount(board.bishops & own & BB_DEVELOPED_BISHOPS)
+        score -= 20 * chess.popcount(board.knights & own & BB_START_KNIGHTS)
+        score -= 20 * chess.popcount(board.bishops & own & BB_START_BISHOPS)
+        score -= 50 * chess.popcount(board.queens & own & BB_QUEEN_EARLY)
+        if not board.occupied & BB_KING_HOME[color]:
+            score += 50
+        return score
+
+    def evaluate(self, board):
+        """Оценка позиции с точки зрения белых."""
+        if not any(board.generate_legal_moves()):
+            if board.is_check():
+                return -MATE_SCORE if board.turn else MATE_SCORE
+            return 0
+        if board.is_insufficient_material():
+            return 0
+
+        if self.pawn_structure is None:
+            self.pawn_structure = self.compute_pawn_structure(board)
+
+        eval = self.piece_square + self.pawn_structure
+
+        # Контроль центра и пространственное преимущество
+        white_attacks = self.attacked_squares(board, chess.WHITE)
+        black_attacks = self.attacked_squares(board, chess.BLACK)
+        eval += 20 * (chess.popcount(white_attacks & BB_CENTER) - chess.popcount(black_attacks & BB_CENTER))
+        eval += 15 * (chess.popcount(white_attacks) - chess.popcount(black_attacks))
+
+        # Дебютные принципы
+        if board.fullmove_number <= 10:
+            eval += self.opening_principles(board, chess.WHITE)
+            eval -= self.opening_principles(board, chess.BLACK)
+
+        # Контроль над открытыми линиями
+        eval += self.open_lines(board, chess.WHITE)
+        eval -= self.open_lines(board, chess.BLACK)
+
+        return eval
@@ -0,0 +1,123 @@
+import chess
+
+r'''
+/ ============================ \
+
+          MOVE ORDERING
+
+\ ============================ /
+'''
+
+MAX_PLY = 64
+
+# Маски полей для оценки тихих ходов
+BB_CENTER = chess.BB_D4 | chess.BB_E4 | chess.BB_D5 | chess.BB_E5
+BB_DEVELOPED = (chess.BB_C3 | chess.BB_F3 | chess.BB_C6 | chess.BB_F6
+                | chess.BB_C4 | chess.BB_F4 | chess.BB_C5 | chess.BB_F5)
+MINOR_PIECE_TYPES = (chess.KNIGHT, chess.BISHOP)
+
+# Приоритеты групп ходов
+HASH_MOVE_SCORE = 10_000_000
+CAPTURE_SCORE = 1_000_000
+PROMOTION_SCORE = 900_000
+KILLER_SCORE = 800_000
+HISTORY_MAX = 100_000  # При превышении история делится пополам
+
+# MVV-LVA: сначала самая ценная жертва, при равной жертве - самый дешевый нападающий
+MVV_LVA = [[0] * 7 for _ in range(7)]
+for _victim in chess.PIECE_TYPES:
+    for _attacker in chess.PIECE_TYPES:
+        MVV_LVA[_victim][_attacker] = _victim * 10 - _attacker
+
+
+class MoveOrderer:
+    """
+    Сортировка ходов: ход из таблицы транспозиции, взятия по MVV-LVA,
+    превращения, два "убийственных" хода на каждый ply и таблица истории.
+    Ведет статистику отсечений на первом ходу.
+    """
+
+    def __init__(self):
+        self.killers = [[None, None] for _ in range(MAX_PLY)]
+        self.history = [[0] * 4096 for _ in chess.COLORS]  # [цвет][откуда * 64 + куда]
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+
+    def new_search(self):
+        """Готовит таблицы к новому поиску: старая история затухает, killer-ходы сбрасываются."""
+        for table in self.history:
+            for index, value in enumerate(table):
+                if value:
+                    table[index] = value >> 2
+        for slots in self.killers:
+            slots[0] = slots[1] = None
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+
+    def score(self, board, move, killers, history, them):
+        """Приоритет хода (больше - раньше)."""
+        from_square, to_square = move.from_square, move.to_square
+        piece_type = board.piece_type_at(from_square)
+
+        if chess.BB_SQUARES[to_square] & them:
+            score = CAPTURE_SCORE + MVV_LVA[board.piece_type_at(to_square)][piece_type]
+            if move.promotion:
+                score += move.promotion
+            return score
+        if piece_type == chess.PAWN and to_square == board.ep_square:
+            return CAPTURE_SCORE + MVV_LVA[chess.PAWN][chess.PAWN]
+        if move.promotion:
+            return PROMOTION_SCORE + move.promotion
+        if move == killers[0]:
+            return KILLER_SCORE + 1
+        if move == killers[1]:
+            return KILLER_SCORE
+
+        score = history[from_square * 64 + to_square]
+        to_mask = chess.BB_SQUARES[to_square]
+        if to_mask & BB_CENTER:
+            if piece_type == chess.QUEEN:
+                score -= 2000  # Штраф за ферзя в центре
+            elif piece_type == chess.PAWN:
+                score += 300   # Приоритет хода пешек в центр
+        elif to_mask & BB_DEVELOPED and piece_type in MINOR_PIECE_TYPES:
+            score += 200       # Приоритет развития лёгких фигур
+        return score
+
+    def order(self, board, moves, ply=0, hash_move=None):
+        """Возвращает ходы в порядке перебора."""
+        killers = self.killers[ply] if ply < MAX_PLY else (None, None)
+        history = self.history[board.turn]
+        them = board.occupied_co[not board.turn]
+        scores = {move: self.score(board, move, killers, history, them) for move in moves}
+        if hash_move in scores:
+            scores[hash_move] = HASH_MOVE_SCORE
+        return sorted(moves, key=scores.__getitem__, reverse=True)
+
+    def record_cutoff(self, board, move, ply, depth, move_index):
+        """Учитывает ход, вызвавший отсечение по beta (вызывается до хода на доске)."""
+        self.cutoffs += 1
+        if move_index == 0:
+            self.first_move_cutoffs += 1
+
+        if board.is_capture(move) or move.promotion:
+            return
+
+        if ply < MAX_PLY:
+            killers = self.killers[ply]
+            if killers[0] != move:
+                killers[1] = killers[0]
+                killers[0] = move
+
+        history = self.history[board.turn]
+        index = move.from_square * 64 + move.to_square
+        history[index] += depth * depth
+        if history[index] > HISTORY_MAX:
+            for table in self.history:
+                for i, value in enumerate(table):
+                    if value:
+                        table[i] = value >> 1
+
+    def first_move_cutoff_rate(self):
+        """Доля отсечений, вызванных первым же ходом."""
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
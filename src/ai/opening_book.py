@@ -0,0 +1,107 @@
+import chess
+import chess.polyglot
+import random
+from src.ai.zobrist import zobrist_hash
+
+r'''
+/ ============================ \
+
+          OPENING BOOK
+
+\ ============================ /
+'''
+
+
+class OpeningBook:
+    """
+    Дебютная книга: ключ позиции (Zobrist, совместим с Polyglot) -> ходы с весами.
+    Строится из линий базы дебютов; дополнительно может читать книги Polyglot (.bin).
+    Ход выбирается случайно пропорционально весу.
+    """
+
+    def __init__(self, polyglot_path=None, seed=None):
+        """
+        :param polyglot_path: Путь к книге Polyglot (.bin) или None.
+        :param seed: Зерно генератора для выбора хода (None - случайное).
+        """
+        self.entries = {}  # Ключ позиции -> {ход: вес}
+        self.random = random.Random(seed)
+        self.reader = chess.polyglot.open_reader(polyglot_path) if polyglot_path else None
+
+    def __len__(self):
+        return len(self.entries)
+
+    @classmethod
+    def from_database(cls, db, polyglot_path=None, seed=None):
+        """
+        Строит книгу по линиям таблицы Openings (столбец move - ходы через запятую).
+        Вес хода - число линий базы, которые продолжаются этим ходом.
+        :param db: Объект ChessDatabase.
+        """
+        lines = (line.split(',') for line, in db.execute_query('SELECT move FROM Openings ORDER BY id', fetchall=True))
+        return cls.from_lines(lines, polyglot_path, seed)
+
+    @classmethod
+    def from_lines(cls, lines, polyglot_path=None, seed=None):
+        """
+        Строит книгу по готовым линиям ходов (например, из скомпилированной базы дебютов).
+        :param lines: Списки ходов от начальной позиции.
+        """
+        book = cls(polyglot_path, seed)
+        for moves in lines:
+            book.add_line(moves)
+        return book
+
+    def add_line(self, moves):
+        """
+        Добавляет линию ходов от начальной позиции. Ходы в UCI или SAN
+        (в базе встречаются оба формата). Линия обрывается на первом нераспознанном ходе.
+        """
+        board = chess.Board()
+        for text in moves:
+            move = self.parse_move(board, text.strip())
+            if move is None:
+                return
+            weights = self.entries.setdefault(zobrist_hash(board), {})
+            weights[move] = weights.get(move, 0) + 1
+            board.push(move)
+
+    @staticmethod
+    def parse_move(board, text):
+        """Разбирает ход в UCI или SAN; None, если ход нелегален или не распознан."""
+        try:
+            move = chess.Move.from_uci(text)
+            if board.is_legal(move):
+                return move
+        except ValueError:
+            pass
+        try:
+            return board.parse_san(text)
+        except ValueError:
+            return None
+
+    def moves(self, board):
+        """
+        Книжные ходы позиции.
+        :return: Список (ход, вес); пустой, если позиция вне книги.
+        """
+        weights = dict(self.entries.get(zobrist_hash(board), ()))
+        if self.reader is not None:
+            for entry in self.reader.find_all(board):
+                weights[entry.move] = weights.get(entry.move, 0) + entry.weight
+        # Совпадение ключа еще не гарантирует легальность хода
+        return [(move, weight) for move, weight in weights.items() if weight > 0 and board.is_legal(move)]
+
+    def choose(self, board):
+        """Случайный книжный ход с вероятностью, пропорциональной весу, или None вне книги."""
+        candidates = self.moves(board)
+        if not candidates:
+            return None
+        moves, weights = zip(*candidates)
+        return self.random.choices(moves, weights=weights)[0]
+
+    def close(self):
+        """Закрывает книгу Polyglot."""
+        if self.reader is not None:
+            self.reader.close()
+            self.reader = None
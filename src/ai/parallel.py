@@ -0,0 +1,98 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+r'''
+/ ============================ \
+
+        PARALLEL SEARCH
+
+\ ============================ /
+'''
+
+# Экземпляр бота в процессе-помощнике (создается один раз при запуске процесса)
+_worker_bot = None
+
+
+def _init_worker(depth, table_name, table_size_mb, stop_event):
+    """
+    Создает бота процесса-помощника. Если передано имя блока разделяемой памяти,
+    бот подключается к общей таблице транспозиции, иначе заводит свою.
+    """
+    global _worker_bot
+    from src.ai.chessbot import ChessBot
+    from src.ai.transposition import TranspositionTable
+
+    table = TranspositionTable(table_size_mb, name=table_name)
+    _worker_bot = ChessBot(depth=depth, transposition_table=table)
+    _worker_bot.stop_event = stop_event
+
+
+def lazy_smp_search(board, max_time, age, helper_index):
+    """
+    Поиск процесса-помощника Lazy SMP. Нечетные помощники начинают
+    и заканчивают итерации на ход глубже, у всех помощников свой порядок ходов в корне.
+    :return: (завершенная глубина, оценка, ход, число узлов).
+    """
+    _worker_bot.transposition_table.age = age
+    offset = helper_index % 2
+    move, score, depth = _worker_bot.iterative_deepening(
+        board, max_time,
+        start_depth=1 + offset,
+        max_depth=_worker_bot.depth + offset,
+        root_seed=helper_index
+    )
+    return depth, score, move, _worker_bot.stats['nodes']
+
+
+def root_split_search(board, moves, depth, alpha, max_time):
+    """
+    Задача параллельного поиска с разделением ходов корня: оценивает свою
+    часть ходов на заданную глубину. Таблица процесса, killer-ходы и история
+    сбрасываются перед задачей, поэтому результат не зависит от того,
+    какой процесс взял задачу и что он искал до нее. Цена детерминированности -
+    скорость: между раундами (глубинами) ничего не накапливается, и один процесс
+    с таблицей транспозиции обычно доходит до той же глубины быстрее.
+    :return: (список (ход, оценка, главный вариант) или None при прерывании, число узлов).
+    """
+    from src.ai.chessbot import SearchAborted
+    from src.ai.move_ordering import MoveOrderer
+
+    _worker_bot.transposition_table.clear()
+    _worker_bot.move_orderer = MoveOrderer()
+    _worker_bot.stats = {'nodes': 0}
+    _worker_bot.set_time_limit(max_time)
+    try:
+        results = _worker_bot.search_root_moves(board.copy(), moves, depth, alpha)
+    except SearchAborted:
+        results = None
+    finally:
+        _worker_bot.set_time_limit(None)
+    return results, _worker_bot.stats['nodes']
+
+
+class WorkerPool:
+    """
+    Постоянный пул процессов-помощников. Создается один раз и переиспользуется
+    между ходами; при shared=True процессы разделяют таблицу транспозиции.
+    """
+
+    def __init__(self, workers, depth, transposition_table, shared=True):
+        context = multiprocessing.get_context()
+        self.workers = workers
+        self.stop_event = context.Event()  # Сигнал помощникам прервать поиск
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(depth,
+                      transposition_table.name if shared else None,
+                      transposition_table.size_mb,
+                      self.stop_event)
+        )
+
+    def submit(self, fn, *args):
+        return self.executor.submit(fn, *args)
+
+    def close(self):
+        self.stop_event.set()
+        self.executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,76 @@
+import chess
+from src.ai.evaluation import PIECE_VALUES
+
+r'''
+/ ============================ \
+
+    STATIC EXCHANGE EVALUATION
+
+\ ============================ /
+'''
+
+
+def attackers_to(board, square, occupied):
+    """Все фигуры обоих цветов, атакующие поле при заданной занятости (с учетом рентгена)."""
+    rank_file = board.rooks | board.queens
+    diagonals = board.bishops | board.queens
+    return ((chess.BB_KNIGHT_ATTACKS[square] & board.knights)
+            | (chess.BB_KING_ATTACKS[square] & board.kings)
+            | (chess.BB_PAWN_ATTACKS[chess.WHITE][square] & board.pawns & board.occupied_co[chess.BLACK])
+            | (chess.BB_PAWN_ATTACKS[chess.BLACK][square] & board.pawns & board.occupied_co[chess.WHITE])
+            | (chess.BB_RANK_ATTACKS[square][chess.BB_RANK_MASKS[square] & occupied] & rank_file)
+            | (chess.BB_FILE_ATTACKS[square][chess.BB_FILE_MASKS[square] & occupied] & rank_file)
+            | (chess.BB_DIAG_ATTACKS[square][chess.BB_DIAG_MASKS[square] & occupied] & diagonals)) & occupied
+
+
+def captured_value(board, move):
+    """Стоимость фигуры, которую забирает ход (0 для тихого хода)."""
+    if board.is_en_passant(move):
+        return PIECE_VALUES[chess.PAWN]
+    piece_type = board.piece_type_at(move.to_square)
+    return PIECE_VALUES[piece_type] if piece_type else 0
+
+
+def see(board, move):
+    """
+    Статическая оценка размена на поле хода: итог серии взятий,
+    в которой каждая сторона бьет самой дешевой фигурой и может остановиться.
+    Положительное значение - размен выгоден ходящей стороне.
+    """
+    square = move.to_square
+    piece_type = board.piece_type_at(move.from_square)
+    gains = [captured_value(board, move)]
+    on_square = PIECE_VALUES[piece_type]
+    if move.promotion:
+        gains[0] += PIECE_VALUES[move.promotion] - PIECE_VALUES[chess.PAWN]
+        on_square = PIECE_VALUES[move.promotion]
+
+    occupied = board.occupied & ~chess.BB_SQUARES[move.from_square]
+    if board.is_en_passant(move):
+        occupied &= ~chess.BB_SQUARES[square + (-8 if board.turn == chess.WHITE else 8)]
+
+    side = not board.turn
+    while True:
+        attackers = attackers_to(board, square, occupied)
+        own_attackers = attackers & board.occupied_co[side]
+        if not own_attackers:
+            break
+
+        # Самая дешевая бьющая фигура
+        for attacker_type in chess.PIECE_TYPES:
+            candidates = own_attackers & board.pieces_mask(attacker_type, side)
+            if candidates:
+                break
+        if attacker_type == chess.KING and attackers & board.occupied_co[not side]:
+            break  # Король не может бить на защищенное поле
+
+        # Размен досчитывается до конца: отсечение по знаку дает верный знак, но не величину
+        gains.append(on_square - gains[-1])
+        occupied &= ~chess.BB_SQUARES[chess.lsb(candidates)]
+        on_square = PIECE_VALUES[attacker_type]
+        side = not side
+
+    while len(gains) > 1:
+        gains[-2] = -max(-gains[-2], gains[-1])
+        gains.pop()
+    return gains[0]
@@ -0,0 +1,41 @@
+r'''
+/ ============================ \
+
+          TIME CONTROL
+
+\ ============================ /
+'''
+
+
+class TimeControl:
+    """
+    Контроль времени партии: оставшееся время на часах, добавка за ход
+    и число ходов до следующего контроля. Распределяет время на ход.
+    """
+
+    def __init__(self, remaining, increment=0.0, moves_to_go=None, move_overhead=0.05):
+        """
+        :param remaining: Оставшееся время на часах (секунды).
+        :param increment: Добавка за ход (секунды).
+        :param moves_to_go: Ходов до контроля или None, если всё время на партию.
+        :param move_overhead: Запас на задержки вне поиска (секунды).
+        """
+        self.remaining = remaining
+        self.increment = increment
+        self.moves_to_go = moves_to_go
+        self.move_overhead = move_overhead
+
+    def allocate(self, board=None):
+        """
+        Возвращает время на текущий ход в секундах.
+        Без moves_to_go считаем, что до конца партии осталось от 40 до 20 ходов.
+        """
+        moves_to_go = self.moves_to_go
+        if not moves_to_go:
+            played = board.fullmove_number if board is not None else 1
+            moves_to_go = max(20, 40 - played // 2)
+
+        budget = self.remaining / moves_to_go + self.increment * 0.75
+        # Не тратим на один ход больше половины оставшегося времени
+        budget = min(budget, self.remaining * 0.5)
+        return max(0.01, budget - self.move_overhead)
@@ -0,0 +1,141 @@
+import chess
+from multiprocessing import shared_memory
+
+r'''
+/ ============================ \
+
+      TRANSPOSITION TABLE
+
+\ ============================ /
+'''
+
+# Типы оценок в таблице
+EXACT = 0  # Точная оценка
+LOWER = 1  # Нижняя граница (отсечение по beta)
+UPPER = 2  # Верхняя граница (ни один ход не улучшил alpha)
+
+_SCORE_OFFSET = 1 << 31
+
+
+def encode_move(move):
+    """Упаковывает ход в 15 бит: откуда, куда и фигура превращения."""
+    if move is None:
+        return 0
+    return move.from_square | (move.to_square << 6) | ((move.promotion or 0) << 12)
+
+
+def decode_move(code):
+    """Восстанавливает ход из упакованного значения."""
+    if not code:
+        return None
+    return chess.Move(code & 63, (code >> 6) & 63, (code >> 12) or None)
+
+
+class TranspositionTable:
+    """
+    Таблица транспозиции фиксированного размера.
+    Каждая запись занимает 16 байт: 64-битный ключ Zobrist и 64-битное
+    слово с оценкой, лучшим ходом, глубиной, типом оценки и возрастом.
+    Ключ хранится в виде key ^ data, поэтому запись, наполовину
+    перезаписанная другим процессом, при чтении просто не совпадет по ключу.
+    """
+    ENTRY_SIZE = 16
+
+    def __init__(self, size_mb=16, shared=False, name=None):
+        """
+        :param size_mb: Размер таблицы в мегабайтах.
+        :param shared: Разместить таблицу в разделяемой памяти (для параллельного поиска).
+        :param name: Имя существующего блока разделяемой памяти, к которому нужно подключиться.
+        """
+        entries = max(1, int(size_mb * 1024 * 1024) // self.ENTRY_SIZE)
+        self.size_mb = size_mb
+        self.size = 1 << (entries.bit_length() - 1)  # Степень двойки для индексации маской
+        self.mask = self.size - 1
+        self.age = 0
+        nbytes = self.size * self.ENTRY_SIZE
+
+        self._shm = None
+        self._owner = False
+        if name is not None:
+            self._shm = shared_memory.SharedMemory(name=name)
+            buffer = self._shm.buf
+        elif shared:
+            self._shm = shared_memory.SharedMemory(create=True, size=nbytes)
+            self._owner = True
+            buffer = self._shm.buf
+        else:
+            buffer = bytearray(nbytes)
+
+        self._view = memoryview(buffer)[:nbytes]
+        self.keys = self._view[:self.size * 8].cast('Q')
+        self.data = self._view[self.size * 8:].cast('Q')
+
+    @property
+    def name(self):
+        """Имя блока разделяемой памяти или None для обычной таблицы."""
+        return self._shm.name if self._shm is not None else None
+
+    def close(self):
+        """Освобождает разделяемую память (владелец блока также удаляет его)."""
+        if self._shm is None:
+            return
+        self.keys.release()
+        self.data.release()
+        self._view.release()
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+        self._shm = None
+
+    def new_search(self):
+        """Увеличивает возраст таблицы: записи прошлых поисков вытесняются первыми."""
+        self.age = (self.age + 1) & 63
+
+    def clear(self):
+        """Очищает таблицу."""
+        self._view[:] = bytes(len(self._view))
+        self.age = 0
+
+    def probe(self, key):
+        """
+        Ищет позицию в таблице.
+        :return: (оценка, глубина, тип оценки, лучший ход) или None.
+        """
+        index = key & self.mask
+        data = self.data[index]
+        if self.keys[index] ^ data != key:
+            return None
+        return ((data & 0xFFFFFFFF) - _SCORE_OFFSET,
+                (data >> 48) & 0xFF,
+                (data >> 56) & 0x3,
+                decode_move((data >> 32) & 0xFFFF))
+
+    def store(self, key, depth, score, flag, move):
+        """
+        Сохраняет позицию. Запись из текущего поиска вытесняется
+        только записью с не меньшей глубиной.
+        """
+        index = key & self.mask
+        old_data = self.data[index]
+        same_key = self.keys[index] ^ old_data == key
+        if old_data and not same_key and (old_data >> 58) == self.age and depth < ((old_data >> 48) & 0xFF):
+            return
+
+        move_code = encode_move(move)
+        if same_key and not move_code:
+            move_code = (old_data >> 32) & 0xFFFF  # Сохраняем известный лучший ход
+
+        score = max(-_SCORE_OFFSET, min(_SCORE_OFFSET - 1, int(score)))
+        data = ((score + _SCORE_OFFSET)
+                | (move_code << 32)
+                | (min(depth, 0xFF) << 48)
+                | (flag << 56)
+                | (self.age << 58))
+        self.keys[index] = key ^ data
+        self.data[index] = data
+
+    def hashfull(self):
+        """Заполненность таблицы в промилле (по первой тысяче записей)."""
+        sample = min(1000, self.size)
+        used = sum(1 for i in range(sample) if self.data[i] and (self.data[i] >> 58) == self.age)
+        return used * 1000 // sample
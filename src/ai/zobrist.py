@@ -0,0 +1,75 @@
+import chess
+import chess.polyglot
+
+r'''
+/ ============================ \
+
+        ZOBRIST HASHING
+
+\ ============================ /
+'''
+
+_hasher = chess.polyglot.ZobristHasher(chess.polyglot.POLYGLOT_RANDOM_ARRAY)
+_pieces = chess.polyglot.POLYGLOT_RANDOM_ARRAY
+_turn = chess.polyglot.POLYGLOT_RANDOM_ARRAY[780]
+
+
+def zobrist_hash(board):
+    """Полный 64-битный ключ позиции (совместим с Polyglot)."""
+    return _hasher(board)
+
+
+def _piece_key(piece_type, color, square):
+    return _pieces[64 * ((piece_type - 1) * 2 + int(color)) + square]
+
+
+def piece_changes(board, move):
+    """
+    Возвращает фигуры, которые ход снимает с доски и ставит на неё,
+    в виде двух списков (тип фигуры, цвет, поле). Вызывается до хода.
+    """
+    if not move:
+        return (), ()
+
+    color = board.turn
+    piece_type = board.piece_type_at(move.from_square)
+
+    if board.is_castling(move):
+        rank = chess.square_rank(move.from_square)
+        if board.is_kingside_castling(move):
+            king_to, rook_to = chess.square(6, rank), chess.square(5, rank)
+        else:
+            king_to, rook_to = chess.square(2, rank), chess.square(3, rank)
+        rook_from = move.to_square if board.piece_type_at(move.to_square) == chess.ROOK \
+            and board.color_at(move.to_square) == color \
+            else chess.square(7 if king_to > move.from_square else 0, rank)
+        return ((chess.KING, color, move.from_square), (chess.ROOK, color, rook_from)), \
+               ((chess.KING, color, king_to), (chess.ROOK, color, rook_to))
+
+    removed = [(piece_type, color, move.from_square)]
+    if board.is_en_passant(move):
+        removed.append((chess.PAWN, not color, move.to_square + (-8 if color == chess.WHITE else 8)))
+    else:
+        captured_type = board.piece_type_at(move.to_square)
+        if captured_type:
+            removed.append((captured_type, not color, move.to_square))
+    return removed, ((move.promotion or piece_type, color, move.to_square),)
+
+
+def push_with_key(board, key, move, changes=None):
+    """
+    Делает ход на доске и возвращает ключ новой позиции,
+    пересчитывая только изменившиеся части вместо полного хэширования.
+    :param changes: Результат piece_changes, если он уже посчитан.
+    """
+    removed, added = changes if changes is not None else piece_changes(board, move)
+
+    # Снимаем права рокировки, поле взятия на проходе и очередь хода до хода
+    key ^= _hasher.hash_castling(board) ^ _hasher.hash_ep_square(board) ^ _turn
+    for piece_type, color, square in removed:
+        key ^= _piece_key(piece_type, color, square)
+    for piece_type, color, square in added:
+        key ^= _piece_key(piece_type, color, square)
+
+    board.push(move)
+    return key ^ _hasher.hash_castling(board) ^ _hasher.hash_ep_square(board)
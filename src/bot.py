@@ -1,8 +1,134 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from src.ai.chessbot import ChessBot as AIChessBot
 
 class ChessBotWrapper:
-    def __init__(self, depth):
-        self.bot = AIChessBot( depth=depth)
+    def __init__(self, depth, hash_size_mb=16, move_time=5, workers=1, parallel_mode='lazy_smp', ponder=False, opening_book=None):
+        self.bot = AIChessBot(depth=depth, hash_size_mb=hash_size_mb, workers=workers, parallel_mode=parallel_mode,
+                              opening_book=opening_book)
+        self.move_time = move_time  # Время на ход в секундах
+        self.ponder_enabled = ponder  # Думать на времени соперника
 
-    def find_best_move(self, board):
-        return self.bot.find_best_move(board)
+        # Фоновый поиск: один поток, чтобы окно игры не зависало, пока бот думает
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='chess-bot')
+        self.search = None       # Future текущего фонового поиска
+        self.stop_event = None   # Сигнал остановки текущего фонового поиска
+
+        # Обдумывание на времени соперника
+        self.ponder_search = None  # Future поиска в ожидаемой позиции
+        self.ponder_stop_event = None
+        self.ponder_fen = None     # Позиция после ожидаемого ответа соперника
+
+    def find_best_move(self, board, time_control=None):
+        return self.bot.find_best_move(board, max_time=self.move_time, time_control=time_control)
+
+    def start_search(self, board, callback=None, time_control=None):
+        """
+        Запускает поиск хода в фоновом потоке и сразу возвращает Future.
+        Результат Future - лучший ход или None, если поиск отменен.
+        :param callback: Функция от найденного хода; вызывается в потоке бота.
+        """
+        self.cancel()
+        future = self._take_ponder_hit(board, time_control)
+        if future is None:
+            self.cancel_ponder()
+            stop_event = threading.Event()
+            self.stop_event = stop_event
+            future = self.executor.submit(self._search, board.copy(), stop_event, time_control)
+        if callback is not None:
+            future.add_done_callback(lambda done: callback(done.result()) if not done.cancelled() else None)
+        self.search = future
+        return future
+
+    def _search(self, board, stop_event, time_control, ponder=False):
+        if stop_event.is_set():
+            return None
+        self.bot.stop_event = stop_event
+        try:
+            # Обдумывание идет без ограничения времени до ponderhit или отмены
+            max_time = None if ponder else self.move_time
+            move = self.bot.find_best_move(board, max_time=max_time, time_control=time_control)
+        finally:
+            self.bot.stop_event = None
+        # Отмененный поиск мог вернуть ход для уже устаревшей позиции
+        return None if stop_event.is_set() else move
+
+    def poll(self):
+        """
+        Проверяет фоновый поиск без ожидания.
+        :return: Найденный ход, если поиск завершился, иначе None.
+        """
+        if self.search is None or not self.search.done():
+            return None
+        future, self.search = self.search, None
+        return future.result()
+
+    def is_thinking(self):
+        return self.search is not None and not self.search.done()
+
+    def cancel(self):
+        """Отменяет текущий фоновый поиск (например, после отмены хода или сброса партии)."""
+        if self.search is not None:
+            self.search.cancel()
+            self.stop_event.set()
+            self.search = None
+
+    def ponder(self, board):
+        """
+        Начинает обдумывание на времени соперника: ищет ход в позиции после
+        ожидаемого ответа (второй ход главного варианта). Если соперник сыграет
+        этот ход, start_search продолжит уже идущий поиск с прогретой таблицей.
+        """
+        if not self.ponder_enabled or board.is_game_over():
+            return
+        self.cancel_ponder()
+        expected = self.expected_reply(board)
+        if expected is None:
+            return
+
+        ponder_board = board.copy()
+        ponder_board.push(expected)
+        if ponder_board.is_game_over():
+            return
+        self.ponder_fen = ponder_board.fen()
+        self.ponder_stop_event = threading.Event()
+        self.bot.ponderhit_time = None
+        self.ponder_search = self.executor.submit(self._search, ponder_board, self.ponder_stop_event, None, True)
+
+    def expected_reply(self, board):
+        """
+        Ожидаемый ответ соперника после хода бота. Берется из главного варианта
+        последнего поиска (root_split не заполняет таблицу основного процесса),
+        иначе из таблицы транспозиции.
+        """
+        pv = self.bot.stats.get('pv') or []
+        if len(pv) >= 2 and board.move_stack and board.peek() == pv[0] and board.is_legal(pv[1]):
+            return pv[1]
+        expected = self.bot.principal_variation(board, 1)
+        return expected[0] if expected else None
+
+    def _take_ponder_hit(self, board, time_control):
+        """Если позиция совпала с ожидаемой, превращает обдумывание в обычный поиск с лимитом времени."""
+        if self.ponder_search is None or self.ponder_fen != board.fen():
+            return None
+        max_time = time_control.allocate(board) if time_control is not None else self.move_time
+        self.bot.ponderhit(max_time)
+        future, self.ponder_search = self.ponder_search, None
+        self.stop_event, self.ponder_stop_event = self.ponder_stop_event, None
+        self.ponder_fen = None
+        return future
+
+    def cancel_ponder(self):
+        """Прекращает обдумывание на времени соперника."""
+        if self.ponder_search is not None:
+            self.ponder_search.cancel()
+            self.ponder_stop_event.set()
+            self.ponder_search = None
+            self.ponder_stop_event = None
+            self.ponder_fen = None
+
+    def close(self):
+        self.cancel()
+        self.cancel_ponder()
+        self.executor.shutdown(wait=True)
+        self.bot.close()
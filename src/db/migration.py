@@ -1,7 +1,10 @@
 import sqlite3
 import os
+from src.db.new.database import position_key, migrate_position_keys
 
 class ChessDatabaseMigration:
+    BATCH_SIZE = 1000  # Строк старой таблицы в одной транзакции
+
     def __init__(self, old_db_path, new_db_path):
         self.old_db_path = old_db_path
         self.new_db_path = new_db_path
@@ -40,71 +43,91 @@ class ChessDatabaseMigration:
                     variation_id INTEGER,
                     move TEXT NOT NULL,
                     fen TEXT NOT NULL UNIQUE,  -- Уникальность для FEN
+                    position_key INTEGER,      -- Ключ позиции без счетчиков ходов
                     FOREIGN KEY (opening_id) REFERENCES OpeningsMain (id),
                     FOREIGN KEY (variation_id) REFERENCES OpeningVariations (id)
                 )
             ''')
-
-    def migrate_data(self):
-        """Мигрируем данные из старой базы данных в новую."""
-        cursor_old = self.old_conn.cursor()
-        cursor_old.execute('SELECT * FROM Openings')
-
-        # Начинаем транзакцию
-        self.new_conn.isolation_level = None  # Отключаем авто-коммит
-        cursor_new = self.new_conn.cursor()
-        cursor_new.execute('BEGIN TRANSACTION;')  # Явное начало транзакции
-
-        # Обработка всех записей из старой таблицы
-        for row in cursor_old.fetchall():
-            name_en = row[1]
-            name_ru = row[2]
-            parents = row[3]
-            move = row[4]
-            fen = row[5]
-
-            # Разбираем дебют и вариант из текущей строки
-            opening_name_en, variation_name_en = name_en.split(":", 1) if ":" in name_en else (name_en, "")
-            opening_name_ru, variation_name_ru = name_ru.split(":", 1) if ":" in name_ru else (name_ru, "")
-
-            # Проверяем, существует ли дебют в базе данных
-            try:
-                cursor_new.execute('''INSERT INTO OpeningsMain (name_en, name_ru) VALUES (?, ?)''', 
-                                   (opening_name_en.strip(), opening_name_ru.strip()))
-                opening_id = cursor_new.lastrowid  # Получаем ID дебюта
-            except sqlite3.IntegrityError:
-                # Если запись уже существует, получаем ее ID
-                cursor_new.execute('''SELECT id FROM OpeningsMain WHERE name_en = ? AND name_ru = ?''', 
-                                   (opening_name_en.strip(), opening_name_ru.strip()))
-                opening_id = cursor_new.fetchone()[0]
-
-            # Проверяем, существует ли вариант дебюта
-            if not variation_name_en.strip() and not variation_name_ru.strip():
-                variation_id = None  # Пропускаем пустые варианты
-            else:
-                try:
-                    cursor_new.execute('''INSERT INTO OpeningVariations (variation_name_en, variation_name_ru) VALUES (?, ?)''', 
-                                       (variation_name_en.strip(), variation_name_ru.strip()))
-                    variation_id = cursor_new.lastrowid  # Получаем ID варианта
-                except sqlite3.IntegrityError:
-                    # Если запись уже существует, получаем ее ID
-                    cursor_new.execute('''SELECT id FROM OpeningVariations WHERE variation_name_en = ? AND variation_name_ru = ?''', 
-                                       (variation_name_en.strip(), variation_name_ru.strip()))
-                    variation_id = cursor_new.fetchone()[0]
-
-            # Проверяем, существует ли запись с данным FEN
-            cursor_new.execute('''SELECT id FROM Openings WHERE fen = ?''', (fen,))
-            existing_fen = cursor_new.fetchone()
-
-            if existing_fen:
-                continue  # Пропускаем запись, если FEN уже есть
-
-            # Вставляем запись с ходами и FEN в таблицу Openings
-            cursor_new.execute('''INSERT INTO Openings (opening_id, variation_id, move, fen) VALUES (?, ?, ?, ?)''', 
-                               (opening_id, variation_id, move, fen))
-
-        # Завершаем транзакцию
-        self.new_conn.commit()
+        # Если новая база создана до появления position_key, CREATE TABLE IF NOT EXISTS
+        # не добавит столбец: добавляем его, заполняем ключи и создаем индекс
+        migrate_position_keys(self.new_conn)
+
+    def migrate_data(self, resume=True):
+        """
+        Мигрируем данные из старой базы данных в новую.
+        Строки старой таблицы читаются курсором по порядку id и вставляются пачками
+        по BATCH_SIZE; каждая пачка - отдельная транзакция вместе с контрольной точкой
+        (последним перенесенным id). Прерванную миграцию можно продолжить,
+        а блокировка записи не держится все время миграции.
+        :param resume: Продолжить с контрольной точки; False - начать сначала
+                       (уже перенесенные позиции все равно не дублируются).
+        """
+        with self.new_conn:
+            self.new_conn.execute('''
+                CREATE TABLE IF NOT EXISTS MigrationState (
+                    source TEXT PRIMARY KEY,
+                    last_id INTEGER NOT NULL
+                )
+            ''')
+        last_id = 0
+        if resume:
+            row = self.new_conn.execute('SELECT last_id FROM MigrationState WHERE source = ?',
+                                        (self.old_db_path,)).fetchone()
+            last_id = row[0] if row else 0
+
+        # ID уже перенесенных дебютов и вариантов: вместо SELECT после каждой вставки
+        openings = {(name_en, name_ru): opening_id for opening_id, name_en, name_ru in
+                    self.new_conn.execute('SELECT id, name_en, name_ru FROM OpeningsMain')}
+        variations = {(name_en, name_ru): variation_id for variation_id, name_en, name_ru in
+                      self.new_conn.execute('SELECT id, variation_name_en, variation_name_ru FROM OpeningVariations')}
+
+        # На время загрузки: журнал WAL и запись без ожидания сброса на диск
+        journal_mode = self.new_conn.execute('PRAGMA journal_mode').fetchone()[0]
+        synchronous = self.new_conn.execute('PRAGMA synchronous').fetchone()[0]
+        self.new_conn.execute('PRAGMA journal_mode=WAL')
+        self.new_conn.execute('PRAGMA synchronous=OFF')
+        try:
+            rows = self.old_conn.execute('SELECT id, name_en, name_ru, move, fen FROM Openings WHERE id > ? ORDER BY id',
+                                         (last_id,))
+            while True:
+                batch = rows.fetchmany(self.BATCH_SIZE)
+                if not batch:
+                    break
+                with self.new_conn:
+                    records = []
+                    for row_id, name_en, name_ru, move, fen in batch:
+                        # Разбираем дебют и вариант из текущей строки
+                        opening_name_en, variation_name_en = name_en.split(":", 1) if ":" in name_en else (name_en, "")
+                        opening_name_ru, variation_name_ru = name_ru.split(":", 1) if ":" in name_ru else (name_ru, "")
+                        opening = (opening_name_en.strip(), opening_name_ru.strip())
+                        variation = (variation_name_en.strip(), variation_name_ru.strip())
+
+                        opening_id = openings.get(opening)
+                        if opening_id is None:
+                            opening_id = openings[opening] = self.new_conn.execute(
+                                'INSERT INTO OpeningsMain (name_en, name_ru) VALUES (?, ?)', opening).lastrowid
+
+                        if not variation[0] and not variation[1]:
+                            variation_id = None  # Пропускаем пустые варианты
+                        else:
+                            variation_id = variations.get(variation)
+                            if variation_id is None:
+                                variation_id = variations[variation] = self.new_conn.execute(
+                                    'INSERT INTO OpeningVariations (variation_name_en, variation_name_ru) VALUES (?, ?)',
+                                    variation).lastrowid
+
+                        records.append((opening_id, variation_id, move, fen, position_key(fen)))
+
+                    # Запись с уже перенесенным FEN пропускается
+                    self.new_conn.executemany('''
+                        INSERT OR IGNORE INTO Openings (opening_id, variation_id, move, fen, position_key)
+                        VALUES (?, ?, ?, ?, ?)
+                    ''', records)
+                    self.new_conn.execute('INSERT OR REPLACE INTO MigrationState (source, last_id) VALUES (?, ?)',
+                                          (self.old_db_path, batch[-1][0]))
+        finally:
+            self.new_conn.execute(f'PRAGMA synchronous={synchronous}')
+            self.new_conn.execute(f'PRAGMA journal_mode={journal_mode}')
 
     def close(self):
         """Закрываем соединения с базами данных."""
@@ -0,0 +1,224 @@
+import os
+import mmap
+import struct
+import logging
+import argparse
+from typing import Dict, List, Optional, Tuple
+from src.db.new.database import ChessDatabase, position_key
+from src.db.new.opening_index import UNKNOWN_POSITION, full_name, source_signature
+
+# Формат файла (все числа little-endian):
+#   заголовок HEADER;
+#   записи RECORD, отсортированные по (ключ позиции, id в базе);
+#   таблицы названий дебютов и вариантов NAME (смещения и длины строк EN и RU);
+#   строки UTF-8 (названия и FEN);
+#   ходы всех записей через '\n' в порядке id - по ним строится дебютная книга.
+# Смещения в записях и таблицах названий - от начала файла.
+MAGIC = b'OPNB'
+VERSION = 1
+HEADER = struct.Struct('<4sIIIIQQ4Q')  # магия, версия, записей, дебютов, вариантов, смещение и длина ходов, подпись базы
+RECORD = struct.Struct('<qIIIIII')     # ключ, дебют, вариант, смещение и длина ходов, смещение и длина FEN
+NAME = struct.Struct('<IIII')          # смещение и длина названия EN, смещение и длина названия RU
+KEY = struct.Struct('<q')
+NO_VARIATION = 0xFFFFFFFF
+
+
+def compile_openings(db: ChessDatabase, path: str) -> int:
+    """
+    Компилирует базу дебютов в двоичный файл для CompiledOpenings.
+    FEN хранится только у записей, ключ позиции которых встречается несколько раз:
+    по нему выбирается запись, как в ChessDatabase.get_full_opening_name_by_fen.
+    :param db: База дебютов.
+    :param path: Путь к файлу.
+    :return: Число записей.
+    """
+    rows = db.execute_query('''
+        SELECT o.id, o.position_key, o.opening_id, o.variation_id, o.move, o.fen
+        FROM Openings o
+        ORDER BY o.id
+    ''', fetchall=True)
+    openings = db.execute_query('SELECT id, name_en, name_ru FROM OpeningsMain ORDER BY id', fetchall=True)
+    variations = db.execute_query(
+        'SELECT id, variation_name_en, variation_name_ru FROM OpeningVariations ORDER BY id', fetchall=True)
+    opening_index = {opening_id: index for index, (opening_id, _, _) in enumerate(openings)}
+    variation_index = {variation_id: index for index, (variation_id, _, _) in enumerate(variations)}
+
+    key_counts: Dict[int, int] = {}
+    for row in rows:
+        key_counts[row[1]] = key_counts.get(row[1], 0) + 1
+
+    strings_offset = HEADER.size + RECORD.size * len(rows) + NAME.size * (len(openings) + len(variations))
+    strings = bytearray()
+
+    def add_string(text: Optional[str]) -> Tuple[int, int]:
+        data = (text or '').encode('utf-8')
+        offset = strings_offset + len(strings)
+        strings.extend(data)
+        return offset, len(data)
+
+    names = bytearray()
+    for _, name_en, name_ru in openings + variations:
+        names += NAME.pack(*add_string(name_en), *add_string(name_ru))
+
+    fens = [add_string(row[5]) if key_counts[row[1]] > 1 else (0, 0) for row in rows]
+    moves_offset = strings_offset + len(strings)  # Ходы идут сразу за строками
+    moves = bytearray()
+    records = []
+    for row, fen in zip(rows, fens):
+        row_id, key, opening_id, variation_id, move, _ = row
+        data = move.encode('utf-8')
+        records.append((key, row_id, RECORD.pack(
+            key, opening_index[opening_id],
+            NO_VARIATION if variation_id is None else variation_index[variation_id],
+            moves_offset + len(moves), len(data), *fen)))
+        moves += data + b'\n'
+    records.sort(key=lambda record: record[:2])
+
+    signature = (source_signature(db.db_path) + [0, 0])[:4]
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(records), len(openings), len(variations),
+                               moves_offset, len(moves), *signature))
+        file.writelines(record for _, _, record in records)
+        file.write(names)
+        file.write(strings)
+        file.write(moves)
+    os.replace(temp_path, path)
+    logging.info(f"Сохранена скомпилированная база дебютов: {path} ({len(records)} позиций)")
+    return len(records)
+
+
+class CompiledOpenings:
+    """
+    Названия дебютов из скомпилированного файла: файл отображается в память (mmap),
+    позиция ищется двоичным поиском по ключам прямо в отображении, без загрузки файла
+    и без соединения с базой. Страницы файла общие для всех процессов, которые его открыли.
+    Интерфейс поиска тот же, что у ChessDatabase и OpeningIndex.
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: Путь к файлу, созданному compile_openings.
+        """
+        self.path = path
+        with open(path, 'rb') as file:
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            (magic, version, self.count, self.openings_count, self.variations_count,
+             self.moves_offset, self.moves_size, *self.signature) = HEADER.unpack_from(self.data, 0)
+        except struct.error:
+            self.data.close()
+            raise ValueError(f"Файл {path} не является скомпилированной базой дебютов")
+        if magic != MAGIC or version != VERSION:
+            self.data.close()
+            raise ValueError(f"Файл {path} не является скомпилированной базой дебютов версии {VERSION}")
+        self.records_offset = HEADER.size
+        self.openings_offset = self.records_offset + RECORD.size * self.count
+        self.variations_offset = self.openings_offset + NAME.size * self.openings_count
+
+    def __len__(self):
+        return self.count
+
+    @staticmethod
+    def is_current(path: str, db_path: str) -> bool:
+        """
+        Проверяет, что файл существует, имеет нужный формат и скомпилирован из текущей версии базы.
+        Если базы нет, подходящий файл считается актуальным: игра может работать только с ним.
+        """
+        try:
+            with open(path, 'rb') as file:
+                header = HEADER.unpack(file.read(HEADER.size))
+        except (OSError, struct.error):
+            return False
+        if header[0] != MAGIC or header[1] != VERSION:
+            return False
+        if not os.path.exists(db_path):
+            return True
+        return list(header[7:]) == (source_signature(db_path) + [0, 0])[:4]
+
+    def key_at(self, index: int) -> int:
+        return KEY.unpack_from(self.data, self.records_offset + RECORD.size * index)[0]
+
+    def string(self, offset: int, length: int) -> str:
+        return self.data[offset:offset + length].decode('utf-8')
+
+    def find(self, fen: str) -> Optional[Tuple[int, ...]]:
+        """
+        Ищет запись позиции. Если позиция встречается в базе несколько раз,
+        берется запись с точно таким же FEN, иначе первая по id.
+        :return: Поля записи RECORD или None.
+        """
+        key = position_key(fen)
+        low, high = 0, self.count
+        while low < high:  # Первая запись с ключом не меньше искомого
+            middle = (low + high) // 2
+            if self.key_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low == self.count or self.key_at(low) != key:
+            return None
+
+        first = RECORD.unpack_from(self.data, self.records_offset + RECORD.size * low)
+        index = low + 1
+        while index < self.count and self.key_at(index) == key:  # Несколько записей с этим ключом
+            record = RECORD.unpack_from(self.data, self.records_offset + RECORD.size * index)
+            if self.string(record[5], record[6]) == fen:
+                return record
+            index += 1
+        return first
+
+    def names(self, offset: int, index: int) -> Tuple[str, str]:
+        en_offset, en_length, ru_offset, ru_length = NAME.unpack_from(self.data, offset + NAME.size * index)
+        return self.string(en_offset, en_length), self.string(ru_offset, ru_length)
+
+    def get_names(self, fen: str) -> Optional[Tuple[str, str]]:
+        """Возвращает (название на английском, на русском) для позиции или None."""
+        record = self.find(fen)
+        if record is None:
+            return None
+        opening_en, opening_ru = self.names(self.openings_offset, record[1])
+        variation_en = variation_ru = None
+        if record[2] != NO_VARIATION:
+            variation_en, variation_ru = self.names(self.variations_offset, record[2])
+        return full_name(opening_en, variation_en), full_name(opening_ru, variation_ru)
+
+    def get_moves(self, fen: str) -> Optional[List[str]]:
+        """Ходы линии базы, которая ведет в позицию, или None."""
+        record = self.find(fen)
+        return None if record is None else self.string(record[3], record[4]).split(',')
+
+    def lines(self) -> List[List[str]]:
+        """Линии ходов всех записей в порядке базы - для OpeningBook.from_lines."""
+        moves = self.string(self.moves_offset, self.moves_size)
+        return [line.split(',') for line in moves.split('\n')[:-1]]
+
+    def get_full_opening_name_by_fen(self, fen: str, language: str = 'EN') -> str:
+        """
+        Возвращает полное название дебюта (включая вариант) по FEN.
+        :param fen: Позиция в формате FEN.
+        :param language: Язык ('EN' или 'RU').
+        :return: Строка с названием дебюта или "Unknown Position" / "Неизвестная позиция".
+        """
+        names = self.get_names(fen)
+        if names is None:
+            return UNKNOWN_POSITION['EN'] if language == 'EN' else UNKNOWN_POSITION['RU']
+        return names[0] if language == 'EN' else names[1]
+
+    def close(self):
+        """Закрывает отображение файла."""
+        self.data.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Компиляция базы дебютов в двоичный файл для быстрого поиска.")
+    parser.add_argument('--db', default='data/openings/chess_openings.db', help="Путь к базе дебютов")
+    parser.add_argument('--output', help="Путь к файлу (по умолчанию рядом с базой, с расширением .compiled)")
+    args = parser.parse_args()
+
+    with ChessDatabase(args.db, read_only=True) as db:
+        compile_openings(db, args.output or os.path.splitext(args.db)[0] + '.compiled')
+
+
+if __name__ == "__main__":
+    main()
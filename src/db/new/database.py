@@ -1,22 +1,151 @@
 import os
 import sqlite3
 import logging
+import hashlib
+import chess
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from typing import Tuple, List, Optional
 
 # Настройка логирования
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
 
 
+def position_key(fen: str) -> int:
+    """
+    Нормализованный ключ позиции: 64-битный хеш расстановки фигур, очереди хода,
+    рокировок и поля взятия на проходе (только если взятие легально). Счетчики ходов
+    не учитываются, поэтому позиция, полученная перестановкой ходов, дает тот же ключ.
+    Ключ знаковый, чтобы помещаться в INTEGER SQLite.
+    """
+    fields = fen.split()[:4]
+    if fields[3] != '-' and not chess.Board(fen).has_legal_en_passant():
+        fields[3] = '-'
+    digest = hashlib.blake2b(' '.join(fields).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little', signed=True)
+
+
+def migrate_position_keys(conn: sqlite3.Connection):
+    """
+    Добавляет в таблицу Openings столбец position_key с индексом, если его нет,
+    и заполняет ключи для записей, у которых он еще не вычислен.
+    Используется и ChessDatabase, и миграцией из старой базы.
+    :param conn: Соединение с базой на запись.
+    """
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(Openings)')]
+    if 'position_key' in columns and not conn.execute(
+            'SELECT 1 FROM Openings WHERE position_key IS NULL LIMIT 1').fetchone():
+        return
+    with conn:
+        if 'position_key' not in columns:
+            logging.info("Добавление столбца position_key в таблицу Openings...")
+            conn.execute('ALTER TABLE Openings ADD COLUMN position_key INTEGER')
+        rows = conn.execute('SELECT id, fen FROM Openings WHERE position_key IS NULL').fetchall()
+        if rows:
+            conn.executemany('UPDATE Openings SET position_key = ? WHERE id = ?',
+                             [(position_key(fen), opening_id) for opening_id, fen in rows])
+            logging.info(f"Заполнены ключи позиций: {len(rows)}")
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_openings_position_key ON Openings (position_key)')
+
+
 class ChessDatabase:
-    def __init__(self, db_path: str):
+    MMAP_SIZE = 64 * 1024 * 1024  # Отображение файла базы в память (байт)
+    CACHE_SIZE_KB = 16 * 1024      # Кеш страниц SQLite (КБ)
+    CACHED_STATEMENTS = 256        # Подготовленные запросы, которые соединение держит в кеше
+    LOOKUP_WORKERS = 2             # Потоки для асинхронного поиска названий
+
+    def __init__(self, db_path: str, read_only: bool = False):
         """
         Инициализация базы данных. Создает соединение с базой данных
         и вызывает метод для создания таблиц, если их нет.
+        :param db_path: Путь к файлу базы.
+        :param read_only: Открыть базу только для чтения (для игры). Такое соединение
+                          не выполняет DDL и не блокирует базу для других процессов;
+                          схема обновляется через временное соединение на запись, только если это нужно.
+
+        Объект можно использовать из нескольких потоков: каждый поток получает
+        собственное соединение (см. conn), закрываются они все вместе в close().
         """
         self.db_path = db_path
+        self.read_only = read_only
+        self._local = threading.local()  # Соединение и глубина транзакции текущего потока
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        if read_only:
+            if not self.schema_ready():
+                logging.info("Схема базы устарела, обновление через соединение на запись...")
+                ChessDatabase(db_path).close()
+            return
+
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
-        self.conn = sqlite3.connect(self.db_path)  # Создание соединения
         self.create_tables()  # Создание таблиц
+        self.migrate_position_keys()  # Ключи позиций для поиска без учета счетчиков ходов
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """
+        Соединение текущего потока; создается при первом обращении из потока.
+        Соединение SQLite нельзя разделять между потоками, поэтому у каждого потока свое.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self.connect()
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def connect(self) -> sqlite3.Connection:
+        """
+        Открывает соединение с настройками для быстрого чтения: отображение файла в память,
+        увеличенный кеш страниц и кеш подготовленных запросов. Соединение на запись
+        переводит базу в режим WAL, чтобы читатели не ждали писателя.
+        check_same_thread отключен только для того, чтобы close() мог закрыть соединения
+        других потоков; запросы через соединение выполняет только его поток.
+        """
+        if self.read_only:
+            conn = sqlite3.connect(f'file:{self.db_path}?mode=ro', uri=True,
+                                   cached_statements=self.CACHED_STATEMENTS, check_same_thread=False)
+        else:
+            conn = sqlite3.connect(self.db_path, cached_statements=self.CACHED_STATEMENTS, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')  # В режиме WAL это безопасно
+        conn.execute(f'PRAGMA mmap_size={self.MMAP_SIZE}')
+        conn.execute(f'PRAGMA cache_size={-self.CACHE_SIZE_KB}')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        return conn
+
+    def schema_ready(self) -> bool:
+        """Проверяет, что база существует и ключи позиций уже заполнены."""
+        if not os.path.exists(self.db_path):
+            return False
+        conn = sqlite3.connect(f'file:{self.db_path}?mode=ro', uri=True)
+        try:
+            columns = [row[1] for row in conn.execute('PRAGMA table_info(Openings)')]
+            if 'position_key' not in columns:
+                return False
+            return conn.execute('SELECT 1 FROM Openings WHERE position_key IS NULL LIMIT 1').fetchone() is None
+        finally:
+            conn.close()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Группа изменений в одной транзакции (для инструментов наполнения базы):
+        execute_query внутри нее не фиксирует каждое изменение отдельно.
+        Транзакция относится к соединению текущего потока.
+        """
+        depth = getattr(self._local, 'transaction_depth', 0)
+        self._local.transaction_depth = depth + 1
+        try:
+            if depth == 0:
+                with self.conn:
+                    yield self
+            else:
+                yield self
+        finally:
+            self._local.transaction_depth = depth
 
     def __enter__(self):
         """
@@ -28,28 +157,32 @@ class ChessDatabase:
         """
         Закрытие соединения при выходе из контекста.
         """
-        self.conn.close()
+        self.close()
 
     def create_tables(self):
         """
         Создает таблицы базы данных, если они еще не существуют.
         """
+        existing = {row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if {'OpeningsMain', 'OpeningVariations', 'Openings'} <= existing:
+            return  # Таблицы уже есть: DDL при каждом запуске не нужен
         with self.conn:
             logging.info("Создание таблиц, если они отсутствуют...")
             self.conn.execute('''
                 CREATE TABLE IF NOT EXISTS OpeningsMain (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     name_en TEXT NOT NULL,
-                    name_ru TEXT
+                    name_ru TEXT NOT NULL,
+                    UNIQUE(name_en, name_ru)
                 )
             ''')
+            # Варианты не привязаны к дебюту: одно название варианта встречается у разных дебютов
             self.conn.execute('''
                 CREATE TABLE IF NOT EXISTS OpeningVariations (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    opening_id INTEGER NOT NULL,
-                    variation_name_en TEXT,
-                    variation_name_ru TEXT,
-                    FOREIGN KEY (opening_id) REFERENCES OpeningsMain (id)
+                    variation_name_en TEXT NOT NULL,
+                    variation_name_ru TEXT NOT NULL,
+                    UNIQUE(variation_name_en, variation_name_ru)
                 )
             ''')
             self.conn.execute('''
@@ -59,11 +192,19 @@ class ChessDatabase:
                     variation_id INTEGER,
                     move TEXT NOT NULL,
                     fen TEXT NOT NULL UNIQUE,
+                    position_key INTEGER,
                     FOREIGN KEY (opening_id) REFERENCES OpeningsMain (id),
                     FOREIGN KEY (variation_id) REFERENCES OpeningVariations (id)
                 )
             ''')
 
+    def migrate_position_keys(self):
+        """
+        Добавляет в таблицу Openings столбец position_key с индексом, если его нет,
+        и заполняет ключи для записей, у которых он еще не вычислен.
+        """
+        migrate_position_keys(self.conn)
+
     def execute_query(self, query: str, params: Tuple = (), fetchone: bool = False, fetchall: bool = False):
         """
         Универсальный метод для выполнения SQL-запросов.
@@ -73,13 +214,13 @@ class ChessDatabase:
         :param fetchall: Возвращать все записи.
         :return: Результат запроса (одна или несколько записей) или None.
         """
-        cursor = self.conn.cursor()
-        cursor.execute(query, params)
+        cursor = self.conn.execute(query, params)  # Подготовленный запрос берется из кеша соединения
         if fetchone:
             return cursor.fetchone()
         elif fetchall:
             return cursor.fetchall()
-        self.conn.commit()
+        if not getattr(self._local, 'transaction_depth', 0):
+            self.conn.commit()
 
     def create_opening(self, name_en: str, name_ru: str):
         """
@@ -119,9 +260,35 @@ class ChessDatabase:
         self.execute_query(query, (opening_id,))
         logging.info(f"Удален дебют ID {opening_id}")
 
+    def create_variation(self, name_en: str, name_ru: str):
+        """
+        Создает запись варианта дебюта, если такой еще нет.
+        :param name_en: Название варианта на английском.
+        :param name_ru: Название варианта на русском.
+        """
+        query = 'INSERT OR IGNORE INTO OpeningVariations (variation_name_en, variation_name_ru) VALUES (?, ?)'
+        self.execute_query(query, (name_en, name_ru))
+        logging.info(f"Создан вариант: {name_en} ({name_ru})")
+
+    def create_opening_record(self, opening_id: int, variation_id: Optional[int], move: str, fen: str):
+        """
+        Добавляет позицию дебюта. Позиция с уже известным FEN не перезаписывается.
+        :param opening_id: ID дебюта.
+        :param variation_id: ID варианта или None.
+        :param move: Ходы от начальной позиции через запятую.
+        :param fen: Позиция в формате FEN.
+        """
+        query = '''
+            INSERT OR IGNORE INTO Openings (opening_id, variation_id, move, fen, position_key)
+            VALUES (?, ?, ?, ?, ?)
+        '''
+        self.execute_query(query, (opening_id, variation_id, move, fen, position_key(fen)))
+
     def get_full_opening_name_by_fen(self, fen: str, language: str = 'EN') -> str:
         """
         Возвращает полное название дебюта (включая вариант) по FEN.
+        Поиск идет по ключу позиции, поэтому счетчики ходов не важны; если в базе
+        несколько записей с этой позицией, берется запись с точно таким же FEN, иначе первая.
         :param fen: Позиция в формате FEN.
         :param language: Язык ('EN' или 'RU').
         :return: Строка с названием дебюта или "Unknown Position" / "Неизвестная позиция".
@@ -131,9 +298,11 @@ class ChessDatabase:
             FROM Openings o
             LEFT JOIN OpeningsMain om ON o.opening_id = om.id
             LEFT JOIN OpeningVariations ov ON o.variation_id = ov.id
-            WHERE o.fen = ?
+            WHERE o.position_key = ?
+            ORDER BY o.fen = ? DESC, o.id
+            LIMIT 1
         '''
-        result = self.execute_query(query, (fen,), fetchone=True)
+        result = self.execute_query(query, (position_key(fen), fen), fetchone=True)
         if not result:
             return "Unknown Position" if language == 'EN' else "Неизвестная позиция"
 
@@ -143,8 +312,29 @@ class ChessDatabase:
         else:
             return f"{opening_name_ru}: {variation_name_ru}" if variation_name_ru else opening_name_ru
 
+    def get_full_opening_name_by_fen_async(self, fen: str, language: str = 'EN') -> Future:
+        """
+        Асинхронный вариант get_full_opening_name_by_fen: запрос выполняется в пуле потоков
+        со своими соединениями, поэтому не задерживает вызывающий поток (интерфейс или поиск бота).
+        :return: Future со строкой названия дебюта.
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.LOOKUP_WORKERS,
+                                                    thread_name_prefix='opening-lookup')
+            return self._executor.submit(self.get_full_opening_name_by_fen, fen, language)
+
     def close(self):
         """
-        Закрывает соединение с базой данных.
+        Закрывает соединения с базой данных всех потоков. Сначала дожидается
+        асинхронных запросов, которые уже поставлены в очередь.
         """
-        self.conn.close()
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
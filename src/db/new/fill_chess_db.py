@@ -77,7 +77,7 @@ def main():
                         variation_id = None
                         if variation:
                             variation_name_en, variation_name_ru = variation
-                            db.create_variation(opening_id, variation_name_en, variation_name_ru)
+                            db.create_variation(variation_name_en, variation_name_ru)
                             variation_id = db.execute_query(
                                 "SELECT id FROM OpeningVariations WHERE variation_name_en = ? AND variation_name_ru = ?",
                                 (variation_name_en, variation_name_ru),
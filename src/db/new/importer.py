@@ -0,0 +1,230 @@
+import os
+import csv
+import logging
+import argparse
+import chess
+import chess.pgn
+from typing import Dict, Iterator, List, Optional, Tuple
+from src.db.new.database import ChessDatabase, position_key
+
+# Строка источника: (дебют EN, дебют RU, вариант EN, вариант RU, ходы от начальной позиции, FEN)
+# Для EPD ходов нет (пустой список), для PGN и TSV FEN вычисляется по ходам (None).
+OpeningLine = Tuple[str, str, str, str, List[chess.Move], Optional[str]]
+
+
+def split_name(name: str) -> Tuple[str, str]:
+    """Разделяет полное название "Дебют: Вариант" на дебют и вариант."""
+    opening, _, variation = name.partition(':')
+    return opening.strip(), variation.strip()
+
+
+def read_pgn(path: str) -> Iterator[OpeningLine]:
+    """
+    Читает линии из PGN по одной партии. Название берется из заголовков Opening
+    и Variation (русские названия - из OpeningRU и VariationRU, если они есть).
+    Партии без заголовка Opening пропускаются.
+    """
+    with open(path, 'r', encoding='utf-8') as file:
+        while True:
+            game = chess.pgn.read_game(file)
+            if game is None:
+                return
+            headers = game.headers
+            name_en = headers.get('Opening', '').strip()
+            if not name_en:
+                continue
+            variation_en = headers.get('Variation', '').strip()
+            if not variation_en:
+                name_en, variation_en = split_name(name_en)
+            yield (name_en, headers.get('OpeningRU', '').strip(), variation_en,
+                   headers.get('VariationRU', '').strip(), list(game.mainline_moves()), None)
+
+
+def read_epd(path: str) -> Iterator[OpeningLine]:
+    """
+    Читает позиции из EPD. Название - из операций opening/variation или из комментария c0
+    вида "Дебют: Вариант".
+    """
+    with open(path, 'r', encoding='utf-8') as file:
+        for line in file:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            board = chess.Board()
+            try:
+                operations = board.set_epd(line)
+            except ValueError:
+                logging.warning(f"Пропущена строка EPD: {line}")
+                continue
+            name_en = str(operations.get('opening') or operations.get('c0') or '').strip()
+            if not name_en:
+                continue
+            variation_en = str(operations.get('variation') or '').strip()
+            if not variation_en:
+                name_en, variation_en = split_name(name_en)
+            yield name_en, '', variation_en, '', [], board.fen()
+
+
+def read_tsv(path: str) -> Iterator[OpeningLine]:
+    """
+    Читает линии из TSV с заголовком (формат lichess chess-openings: eco, name, pgn).
+    Поддерживаются столбцы name (или name_en), name_ru, pgn (SAN) или uci.
+    """
+    with open(path, 'r', encoding='utf-8', newline='') as file:
+        for row in csv.DictReader(file, delimiter='\t'):
+            name_en, variation_en = split_name(row.get('name') or row.get('name_en') or '')
+            name_ru, variation_ru = split_name(row.get('name_ru') or '')
+            if not name_en:
+                continue
+            board = chess.Board()
+            try:
+                if row.get('uci'):
+                    moves = [board.push_uci(uci) for uci in row['uci'].split()]
+                else:
+                    moves = [board.push_san(san) for san in row.get('pgn', '').split()
+                             if not san[0].isdigit()]  # Номера ходов "1." пропускаются
+            except ValueError:
+                logging.warning(f"Пропущена строка TSV с некорректными ходами: {name_en}")
+                continue
+            yield name_en, name_ru, variation_en, variation_ru, moves, None
+
+
+READERS = {'.pgn': read_pgn, '.epd': read_epd, '.tsv': read_tsv}
+
+
+class OpeningImporter:
+    """
+    Потоковый импорт дебютов в ChessDatabase. Файл читается по одной линии,
+    позиции вставляются пачками через executemany в одной транзакции.
+    Названия дебютов и вариантов сопоставляются с ID через словари в памяти,
+    которые заполняются один раз из базы; позиции с уже известным FEN пропускаются.
+    """
+    BATCH_SIZE = 5000
+
+    def __init__(self, db: ChessDatabase, all_positions: bool = False):
+        """
+        :param db: База дебютов.
+        :param all_positions: Добавлять все позиции линии, а не только последнюю.
+                              Промежуточная позиция получает название первой дошедшей до нее линии.
+        """
+        self.db = db
+        self.all_positions = all_positions
+        self.openings: Dict[Tuple[str, str], int] = {}
+        self.variations: Dict[Tuple[str, str], int] = {}
+        self.batch = []
+        self.stats = {'lines': 0, 'positions': 0, 'inserted': 0, 'openings': 0, 'variations': 0}
+
+    def load_names(self):
+        """Заполняет словари названий из базы."""
+        for opening_id, name_en, name_ru in self.db.conn.execute('SELECT id, name_en, name_ru FROM OpeningsMain'):
+            self.openings[(name_en, name_ru)] = opening_id
+        for variation_id, name_en, name_ru in self.db.conn.execute(
+                'SELECT id, variation_name_en, variation_name_ru FROM OpeningVariations'):
+            self.variations[(name_en, name_ru)] = variation_id
+
+    def opening_id(self, name_en: str, name_ru: str) -> int:
+        key = (name_en, name_ru or name_en)  # Без русского названия используется английское
+        opening_id = self.openings.get(key)
+        if opening_id is None:
+            cursor = self.db.conn.execute('INSERT INTO OpeningsMain (name_en, name_ru) VALUES (?, ?)', key)
+            opening_id = self.openings[key] = cursor.lastrowid
+            self.stats['openings'] += 1
+        return opening_id
+
+    def variation_id(self, name_en: str, name_ru: str) -> Optional[int]:
+        if not name_en:
+            return None
+        key = (name_en, name_ru or name_en)
+        variation_id = self.variations.get(key)
+        if variation_id is None:
+            cursor = self.db.conn.execute(
+                'INSERT INTO OpeningVariations (variation_name_en, variation_name_ru) VALUES (?, ?)', key)
+            variation_id = self.variations[key] = cursor.lastrowid
+            self.stats['variations'] += 1
+        return variation_id
+
+    def add_line(self, line: OpeningLine):
+        """Ставит в очередь позиции одной линии."""
+        name_en, name_ru, variation_en, variation_ru, moves, fen = line
+        opening_id = self.opening_id(name_en, name_ru)
+        variation_id = self.variation_id(variation_en, variation_ru)
+        self.stats['lines'] += 1
+
+        if fen is not None:
+            self.queue(opening_id, variation_id, '', fen)
+            return
+        board = chess.Board()
+        played = []
+        for index, move in enumerate(moves):
+            board.push(move)
+            played.append(move.uci())
+            if self.all_positions or index == len(moves) - 1:
+                # Промежуточные позиции получают только дебют, вариант - у последней
+                self.queue(opening_id, variation_id if index == len(moves) - 1 else None,
+                           ','.join(played), board.fen())
+
+    def queue(self, opening_id: int, variation_id: Optional[int], move: str, fen: str):
+        self.batch.append((opening_id, variation_id, move, fen, position_key(fen)))
+        self.stats['positions'] += 1
+        if len(self.batch) >= self.BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        """Вставляет накопленные позиции одним executemany."""
+        if not self.batch:
+            return
+        before = self.db.conn.total_changes
+        self.db.conn.executemany('''
+            INSERT OR IGNORE INTO Openings (opening_id, variation_id, move, fen, position_key)
+            VALUES (?, ?, ?, ?, ?)
+        ''', self.batch)
+        self.stats['inserted'] += self.db.conn.total_changes - before
+        self.batch.clear()
+
+    def import_lines(self, lines: Iterator[OpeningLine]) -> dict:
+        """
+        Импортирует линии в одной транзакции: при ошибке база остается без изменений.
+        :return: Статистика импорта.
+        """
+        self.stats = dict.fromkeys(self.stats, 0)
+        self.load_names()
+        with self.db.conn:
+            for line in lines:
+                self.add_line(line)
+            self.flush()
+        return self.stats
+
+    def import_file(self, path: str, file_format: Optional[str] = None) -> dict:
+        """
+        Импортирует файл PGN, EPD или TSV.
+        :param file_format: Расширение формата ('.pgn', '.epd', '.tsv'); по умолчанию - расширение файла.
+        :return: Статистика импорта.
+        """
+        file_format = (file_format or os.path.splitext(path)[1]).lower()
+        if not file_format.startswith('.'):
+            file_format = '.' + file_format
+        if file_format not in READERS:
+            raise ValueError(f"Неизвестный формат файла: {file_format}")
+        stats = self.import_lines(READERS[file_format](path))
+        logging.info(f"Импорт {path}: линий {stats['lines']}, позиций {stats['positions']}, "
+                     f"добавлено {stats['inserted']}, новых дебютов {stats['openings']}, "
+                     f"новых вариантов {stats['variations']}")
+        return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Импорт дебютов из файлов PGN, EPD и TSV в базу дебютов.")
+    parser.add_argument('files', nargs='+', help="Файлы для импорта")
+    parser.add_argument('--db', default='data/openings/chess_openings.db', help="Путь к базе дебютов")
+    parser.add_argument('--format', help="Формат файлов (pgn, epd, tsv), если он не совпадает с расширением")
+    parser.add_argument('--all-positions', action='store_true', help="Добавлять все позиции линий, а не только последние")
+    args = parser.parse_args()
+
+    with ChessDatabase(args.db) as db:
+        importer = OpeningImporter(db, all_positions=args.all_positions)
+        for path in args.files:
+            importer.import_file(path, args.format)
+
+
+if __name__ == "__main__":
+    main()
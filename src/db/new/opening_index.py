@@ -0,0 +1,130 @@
+import os
+import json
+import logging
+from typing import Dict, Optional, Tuple
+from src.db.new.database import position_key
+
+UNKNOWN_POSITION = {'EN': "Unknown Position", 'RU': "Неизвестная позиция"}
+
+
+def full_name(opening_name: Optional[str], variation_name: Optional[str]) -> Optional[str]:
+    """Полное название: "Дебют: Вариант" или только дебют, если варианта нет."""
+    return f"{opening_name}: {variation_name}" if variation_name else opening_name
+
+
+def source_signature(db_path: str) -> list:
+    """
+    Размер и время изменения файла базы: по ним видно, что построенные по базе данные устарели.
+    В режиме WAL изменения сначала попадают в журнал -wal, поэтому учитывается и он.
+    """
+    stat = os.stat(db_path)
+    signature = [stat.st_size, stat.st_mtime_ns]
+    if os.path.exists(db_path + '-wal'):
+        wal_stat = os.stat(db_path + '-wal')
+        signature += [wal_stat.st_size, wal_stat.st_mtime_ns]
+    return signature
+
+
+class OpeningIndex:
+    """
+    Названия дебютов в памяти: поиск по позиции - одна проверка словаря вместо SQL-запроса.
+    Названия хранятся по нормализованному ключу позиции. Если в базе одна позиция
+    встречается с разными счетчиками ходов и под разными названиями, точный FEN
+    записывается отдельно, чтобы результат совпадал с поиском по FEN в базе.
+    """
+    SNAPSHOT_VERSION = 2
+
+    def __init__(self, names: Dict[int, Tuple[str, str]], exact_names: Optional[Dict[str, Tuple[str, str]]] = None):
+        """
+        :param names: Ключ позиции -> (полное название на английском, на русском).
+        :param exact_names: FEN -> названия для позиций, название которых зависит от счетчиков ходов.
+        """
+        self.names = names
+        self.exact_names = exact_names or {}
+
+    def __len__(self):
+        return len(self.names)
+
+    @classmethod
+    def from_database(cls, db) -> 'OpeningIndex':
+        """
+        Строит индекс по таблицам Openings, OpeningsMain и OpeningVariations.
+        :param db: Объект ChessDatabase.
+        """
+        query = '''
+            SELECT o.fen, o.position_key, om.name_en, om.name_ru, ov.variation_name_en, ov.variation_name_ru
+            FROM Openings o
+            LEFT JOIN OpeningsMain om ON o.opening_id = om.id
+            LEFT JOIN OpeningVariations ov ON o.variation_id = ov.id
+            ORDER BY o.id
+        '''
+        names, exact_names = {}, {}
+        for fen, key, name_en, name_ru, variation_name_en, variation_name_ru in db.execute_query(query, fetchall=True):
+            entry = (full_name(name_en, variation_name_en), full_name(name_ru, variation_name_ru))
+            if key not in names:
+                names[key] = entry
+            elif names[key] != entry:
+                exact_names[fen] = entry  # Первая запись с этим ключом остается в names
+        return cls(names, exact_names)
+
+    @classmethod
+    def load(cls, db, snapshot_path: Optional[str] = None) -> 'OpeningIndex':
+        """
+        Загружает индекс из файла снимка, если он построен по текущей версии базы,
+        иначе строит индекс по базе и сохраняет снимок.
+        :param db: Объект ChessDatabase.
+        :param snapshot_path: Путь к снимку (по умолчанию рядом с базой, с расширением .index.json).
+        """
+        if snapshot_path is None:
+            snapshot_path = os.path.splitext(db.db_path)[0] + '.index.json'
+        source = source_signature(db.db_path)
+
+        try:
+            with open(snapshot_path, 'r', encoding='utf-8') as file:
+                snapshot = json.load(file)
+            if snapshot.get('version') == cls.SNAPSHOT_VERSION and snapshot.get('source') == source:
+                # Ключи JSON - строки, ключи позиций - целые числа
+                return cls({int(key): tuple(entry) for key, entry in snapshot['names'].items()},
+                           {fen: tuple(entry) for fen, entry in snapshot['exact_names'].items()})
+        except (OSError, ValueError, KeyError):
+            pass  # Снимка нет или он поврежден - строим заново
+
+        index = cls.from_database(db)
+        try:
+            index.save_snapshot(snapshot_path, source)
+        except OSError as error:
+            logging.warning(f"Не удалось сохранить снимок индекса дебютов {snapshot_path}: {error}")
+        return index
+
+    def save_snapshot(self, snapshot_path: str, source: list):
+        """Сохраняет индекс в файл снимка; запись атомарная, чтобы не оставить наполовину записанный файл."""
+        temp_path = snapshot_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump({
+                'version': self.SNAPSHOT_VERSION,
+                'source': source,
+                'names': self.names,
+                'exact_names': self.exact_names,
+            }, file, ensure_ascii=False, separators=(',', ':'))
+        os.replace(temp_path, snapshot_path)
+        logging.info(f"Сохранен снимок индекса дебютов: {snapshot_path} ({len(self.names)} позиций)")
+
+    def get_names(self, fen: str) -> Optional[Tuple[str, str]]:
+        """Возвращает (название на английском, на русском) для позиции или None."""
+        names = self.exact_names.get(fen)
+        if names is None:
+            names = self.names.get(position_key(fen))
+        return names
+
+    def get_full_opening_name_by_fen(self, fen: str, language: str = 'EN') -> str:
+        """
+        Возвращает полное название дебюта (включая вариант) по FEN.
+        Та же сигнатура, что и у ChessDatabase, поэтому индекс подставляется вместо базы.
+        :param fen: Позиция в формате FEN.
+        :param language: Язык ('EN' или 'RU').
+        :return: Строка с названием дебюта или "Unknown Position" / "Неизвестная позиция".
+        """
+        names = self.get_names(fen)
+        if names is None:
+            return UNKNOWN_POSITION['EN'] if language == 'EN' else UNKNOWN_POSITION['RU']
+        return names[0] if language == 'EN' else names[1]
@@ -1,12 +1,15 @@
 import pygame
 import time
 import chess
+from collections import OrderedDict, deque
 from src.bot import ChessBotWrapper
-from src.windows.board import draw_board
-from src.windows import promotion_window, color_window
+from src.windows.board import BoardRenderer, legal_move_index
+from src.windows import promotion_window, color_window, fonts
 
 class Game:
-    def __init__(self, window_width, window_height, isBotOn=True, bot_depth=3, name='Chess', icon_path='assets/images/icons/icon.png', font_family='./assets/fonts/graphik_LCG/GraphikLCG-Medium.ttf', chess_db=None, language='EN'):
+    IDLE_FPS = 10  # Частота кадров, когда нет ввода
+    MAX_OPENING_NAMES = 1024  # Сколько названий позиций хранить в кеше
+    def __init__(self, window_width, window_height, isBotOn=True, bot_depth=3, bot_hash_mb=16, bot_move_time=5, bot_workers=1, bot_parallel_mode='lazy_smp', bot_ponder=False, bot_book=None, max_fps=60, show_fps=False, name='Chess', icon_path='assets/images/icons/icon.png', font_family='./assets/fonts/graphik_LCG/GraphikLCG-Medium.ttf', chess_db=None, language='EN'):
         # Инициализация основных параметров
         self.extra_space = 50  # Дополнительное пространство под название позиции
         self.window_width = window_width
@@ -15,9 +18,20 @@ class Game:
         self.key_hold_start = None  # Инициализация времени удержания клавиши
 
         self.square_size = self.window_width // 8
+        self.board_renderer = BoardRenderer(self.square_size, self.extra_space)  # Спрайты и фон доски кешируются
         self.current_opening_name = None  # Название текущего дебюта
         self.screen = pygame.display.set_mode((self.window_width, self.window_height))
+        self.name = name
         pygame.display.set_caption(name)
+
+        # Отрисовка: кадр рисуется целиком только после модальных окон, иначе - изменившиеся области
+        self.clock = pygame.time.Clock()
+        self.max_fps = max_fps  # Ограничение частоты кадров при вводе
+        self.show_fps = show_fps  # Показывать частоту кадров и время отрисовки в заголовке окна
+        self.frame_times = deque(maxlen=120)  # Время отрисовки последних кадров в секундах
+        self.full_redraw = True
+        self.displayed_opening_name = None  # Текст, который сейчас нарисован над доской
+        self.fps_caption_time = 0.0
         
         # Подключение к базе данных дебютов
         self.chess_db = chess_db
@@ -42,24 +56,37 @@ class Game:
 
         # Инициализация бота
         self.board = chess.Board()
+        self.legal_moves = None  # Индекс легальных ходов текущей позиции, строится по требованию
         self.isBotOn = isBotOn
+        self.chess_bot = None
         if self.isBotOn:
-            self.chess_bot = ChessBotWrapper(depth=bot_depth)
+            self.chess_bot = ChessBotWrapper(depth=bot_depth, hash_size_mb=bot_hash_mb, move_time=bot_move_time,
+                                             workers=bot_workers, parallel_mode=bot_parallel_mode,
+                                             ponder=bot_ponder, opening_book=bot_book)
 
         self.dragging_piece = None
         self.player_color = None  # Цвет игрока
         self.flip_board = False  # Нужно ли переворачивать доску для черных
         self.last_move = None  # Последний ход для подсветки
 
-        # История ходов
-        self.move_history = []
-        self.current_move_index = -1
+        # История ходов: сыгранные ходы хранит self.board.move_stack,
+        # отмененные ходы лежат в стеке для повтора (последний отмененный - в конце)
+        self.redo_stack = []
 
         # Название текущего дебюта
         self.current_opening = None
+        self.opening_names = OrderedDict()  # Названия недавних позиций: (fen, язык) -> название, порядок - давность использования
+
+    def close(self):
+        """Освобождает ресурсы бота (процессы поиска и общую память)."""
+        if self.chess_bot is not None:
+            self.chess_bot.close()
+            self.chess_bot = None
 
     def choose_promotion(self):
-        return promotion_window.open(self.screen, self.font_family, self.language)
+        promotion_piece = promotion_window.open(self.screen, self.font_family, self.language)
+        self.full_redraw = True  # Окно выбора закрыло доску
+        return promotion_piece
 
     def choose_color(self):
         self.player_color = color_window.open(self.screen, self.font_family, self.language)
@@ -72,8 +99,11 @@ class Game:
 
         while True:
             mouse_pos = pygame.mouse.get_pos()
+            had_input = False
             for event in pygame.event.get():
+                had_input = True
                 if event.type == pygame.QUIT:
+                    self.cancel_bot_search()
                     pygame.quit()
                     return
                 elif event.type == pygame.MOUSEBUTTONDOWN:
@@ -87,12 +117,18 @@ class Game:
                         self.undo_move()
                     elif event.key == pygame.K_RIGHT:
                         self.redo_move()
+                    elif event.key == pygame.K_HOME:
+                        self.go_to_ply(0)
+                    elif event.key == pygame.K_END:
+                        self.go_to_ply(self.last_ply())
                     elif event.key == pygame.K_r:
                         if self.key_hold_start is None:
                             self.key_hold_start = time.time()  # Начало удержания
                 elif event.type == pygame.KEYUP:
                     if event.key == pygame.K_r:
                         self.key_hold_start = None  # Сброс времени удержания
+                elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED):
+                    self.full_redraw = True  # Окно было закрыто или свернуто: изменившихся клеток недостаточно
 
             # Проверка удержания клавиши R
             if self.key_hold_start is not None:
@@ -121,24 +157,72 @@ class Game:
                     else:
                         self.current_opening_name = "Game Over"
 
-            draw_board(self.screen, self.board, self.dragging_piece, mouse_pos, self.flip_board, self.last_move)
-
-            pygame.draw.rect(self.screen, (255, 255, 255), (0, 0, self.window_width, self.extra_space))
-            self.display_opening_name()
+            frame_start = time.perf_counter()
+            self.render_frame(mouse_pos)
+            self.frame_times.append(time.perf_counter() - frame_start)
 
+            # Бот думает в фоновом потоке, цикл только проверяет готовность хода
+            if not self.board.is_game_over() and self.isBotOn and self.board.turn != self.player_color:
+                if not self.chess_bot.is_thinking():
+                    best_move = self.chess_bot.poll()
+                    if best_move is not None:
+                        self.execute_move(best_move, is_player=False)
+                        # Пока игрок думает, бот считает ответ на ожидаемый ход
+                        self.chess_bot.ponder(self.board)
+                    else:
+                        self.chess_bot.start_search(self.board)
+
+            # Без ввода цикл спит дольше: бот и удержание клавиши R проверяются с IDLE_FPS
+            self.clock.tick(self.max_fps if had_input or self.dragging_piece else self.IDLE_FPS)
+            if self.show_fps:
+                self.update_fps_caption()
+
+    def render_frame(self, mouse_pos):
+        """Рисует кадр: целиком, если нужно, иначе только изменившиеся клетки и строку с названием."""
+        if self.full_redraw:
+            self.board_renderer.draw(self.screen, self.board, self.dragging_piece, mouse_pos, self.flip_board, self.last_move,
+                                     self.legal_move_index())
+            self.draw_opening_banner()
             pygame.display.flip()
+            self.full_redraw = False
+            return
 
-            if not self.board.is_game_over() and self.isBotOn and self.board.turn != self.player_color:
-                time.sleep(1)
-                best_move = self.chess_bot.find_best_move(self.board)
-                if best_move is not None:
-                    self.execute_move(best_move, is_player=False)
+        rects = self.board_renderer.draw_changes(self.screen, self.board, self.dragging_piece, mouse_pos, self.flip_board, self.last_move,
+                                                 self.legal_move_index())
+        if self.current_opening_name != self.displayed_opening_name:
+            rects.append(self.draw_opening_banner())
+        if rects:
+            pygame.display.update(rects)
+
+    def draw_opening_banner(self):
+        """Рисует строку с названием позиции над доской и возвращает ее прямоугольник."""
+        banner = pygame.Rect(0, 0, self.window_width, self.extra_space)
+        pygame.draw.rect(self.screen, (255, 255, 255), banner)
+        self.display_opening_name()
+        self.displayed_opening_name = self.current_opening_name
+        return banner
+
+    def frame_time_stats(self):
+        """
+        Время отрисовки последних кадров.
+        :return: (среднее, максимальное) в миллисекундах.
+        """
+        if not self.frame_times:
+            return 0.0, 0.0
+        return sum(self.frame_times) / len(self.frame_times) * 1000, max(self.frame_times) * 1000
+
+    def update_fps_caption(self):
+        """Показывает частоту кадров и время отрисовки в заголовке окна (раз в секунду)."""
+        now = time.monotonic()
+        if now - self.fps_caption_time < 1:
+            return
+        self.fps_caption_time = now
+        average, worst = self.frame_time_stats()
+        pygame.display.set_caption(f"{self.name} - {self.clock.get_fps():.0f} FPS, {average:.2f} ms (max {worst:.2f} ms)")
 
     def display_title_screen(self):
         """Отображает титульный экран с выбором опций."""
-        font = pygame.font.Font(self.font_family, 48)
-        button_font = pygame.font.Font(self.font_family, 36)
-        title_text = font.render("Chess", True, (0, 0, 0))
+        title_text = fonts.render_text(self.font_family, 48, "Chess")
 
         # Кнопки
         bot_button = pygame.Rect(self.window_width // 2 - 150, self.window_height // 2 - 60, 300, 50)
@@ -154,9 +238,9 @@ class Game:
             pygame.draw.rect(self.screen, (200, 200, 200), no_bot_button)
             pygame.draw.rect(self.screen, (200, 200, 200), language_button)
 
-            bot_text = button_font.render("Играть с ботом" if self.language == "RU" else "Play with Bot", True, (0, 0, 0))
-            no_bot_text = button_font.render("Играть без бота" if self.language == "RU" else "Play without Bot", True, (0, 0, 0))
-            language_text = button_font.render(f"Язык: {self.language}" if self.language == "RU" else f"Language: {self.language}", True, (0, 0, 0))
+            bot_text = fonts.render_text(self.font_family, 36, "Играть с ботом" if self.language == "RU" else "Play with Bot")
+            no_bot_text = fonts.render_text(self.font_family, 36, "Играть без бота" if self.language == "RU" else "Play without Bot")
+            language_text = fonts.render_text(self.font_family, 36, f"Язык: {self.language}" if self.language == "RU" else f"Language: {self.language}")
 
             self.screen.blit(bot_text, (bot_button.x + bot_button.width // 2 - bot_text.get_width() // 2, bot_button.y + 10))
             self.screen.blit(no_bot_text, (no_bot_button.x + no_bot_text.get_width() // 2 - no_bot_text.get_width() // 2, no_bot_button.y + 10))
@@ -179,11 +263,28 @@ class Game:
                         self.language = "RU" if self.language == "EN" else "EN"
 
 
+    def legal_move_index(self):
+        """Индекс легальных ходов текущей позиции {откуда: {куда: (ходы,)}}; строится один раз на позицию."""
+        if self.legal_moves is None:
+            self.legal_moves = legal_move_index(self.board)
+        return self.legal_moves
+
+    def legal_moves_between(self, from_square, to_square):
+        """Легальные ходы с одного поля на другое (четыре хода при превращении пешки)."""
+        return self.legal_move_index().get(from_square, {}).get(to_square, ())
+
+    def cancel_bot_search(self):
+        """Отменяет поиск бота: позиция, для которой он считал, больше не актуальна."""
+        if self.chess_bot is not None:
+            self.chess_bot.cancel()
+            self.chess_bot.cancel_ponder()
+
     def reset_to_start_position(self):
         print("Resetting to start position")
+        self.cancel_bot_search()
         self.board = chess.Board()
-        self.move_history = []
-        self.current_move_index = -1
+        self.legal_moves = None
+        self.redo_stack = []
         self.dragging_piece = None
         self.last_move = None
         self.flip_board = False
@@ -216,9 +317,6 @@ class Game:
             piece_type = piece.symbol().upper()
             self.dragging_piece = (square, (piece_color, piece_type))
 
-            # Обновляем доску для подсветки доступных ходов
-            draw_board(self.screen, self.board, self.dragging_piece, pygame.mouse.get_pos(), self.flip_board, self.last_move)
-
     def handle_mouse_button_up(self, event):
         """Обрабатывает отпускание кнопки мыши и перемещение фигуры."""
         if self.dragging_piece:
@@ -240,32 +338,27 @@ class Game:
             target_square = chess.square(col, row)
             move = chess.Move(self.dragging_piece[0], target_square)
 
-            # Проверяем валидность хода, даже если бот выключен
-            piece = self.board.piece_at(self.dragging_piece[0])
-            if piece and piece.piece_type == chess.PAWN and chess.square_rank(target_square) in [0, 7]:
-                # Проверка на возможное продвижение пешки
-                promotion_move = chess.Move(self.dragging_piece[0], target_square, promotion=chess.QUEEN)
-                if promotion_move in self.board.legal_moves:
-                    # Ход с превращением в ферзя возможен, вызываем выбор фигуры
-                    promotion_piece = self.choose_promotion()
-                    if promotion_piece:
-                        # Создаем ход с выбранной фигурой
-                        move = chess.Move(self.dragging_piece[0], target_square, promotion=promotion_piece)
-                        self.execute_move(move, is_player=True)
-                    else:
-                        print("No promotion piece selected.")
+            # Проверяем валидность хода по индексу легальных ходов, даже если бот выключен
+            moves = self.legal_moves_between(self.dragging_piece[0], target_square)
+            if not moves:
+                print(f"Illegal move attempted: {move}")
+            elif moves[0].promotion:
+                # Ход с превращением пешки возможен, вызываем выбор фигуры
+                promotion_piece = self.choose_promotion()
+                if promotion_piece:
+                    # Создаем ход с выбранной фигурой
+                    move = chess.Move(self.dragging_piece[0], target_square, promotion=promotion_piece)
+                    self.execute_move(move, is_player=True)
                 else:
-                    print(f"Illegal move attempted: {move}")
-            elif move in self.board.legal_moves:
-                self.execute_move(move, is_player=True)
+                    print("No promotion piece selected.")
             else:
-                print(f"Illegal move attempted: {move}")
+                self.execute_move(moves[0], is_player=True)
 
             self.dragging_piece = None
 
     def execute_move(self, move, is_player):
         """Выполняет ход и обновляет состояние игры."""
-        if move not in self.board.legal_moves:
+        if move not in self.legal_moves_between(move.from_square, move.to_square):
             print(f"Invalid move: {move}")
             return
 
@@ -275,14 +368,13 @@ class Game:
             self.move_sound.play()
 
         self.board.push(move)
+        self.legal_moves = None
 
-        # Обновление истории ходов
-        if self.current_move_index < len(self.move_history) - 1:
-            # Если мы делаем новый ход после отмены
-            self.move_history = self.move_history[:self.current_move_index + 1]
-
-        self.move_history.append(move)
-        self.current_move_index += 1
+        # Обновление истории ходов: ход, совпавший с отмененным, сохраняет остаток истории
+        if self.redo_stack and self.redo_stack[-1] == move:
+            self.redo_stack.pop()
+        else:
+            self.redo_stack.clear()
         self.last_move = move
 
         # Обновляем название дебюта
@@ -295,52 +387,74 @@ class Game:
 
     def update_opening(self):
         """Обновляет название текущего дебюта и варианта на основе позиции."""
-        if self.chess_db:
-            fen = self.board.fen()
-            self.current_opening_name = self.chess_db.get_full_opening_name_by_fen(fen, self.language)
+        if self.chess_db is not None:
+            key = (self.board.fen(), self.language)
+            name = self.opening_names.get(key)
+            if name is None:
+                name = self.opening_names[key] = self.chess_db.get_full_opening_name_by_fen(key[0], self.language)
+                if len(self.opening_names) > self.MAX_OPENING_NAMES:
+                    self.opening_names.popitem(last=False)
+            else:
+                self.opening_names.move_to_end(key)
+            self.current_opening_name = name
+        else:
+            self.current_opening_name = None  # Убираем надпись об окончании партии после отмены хода
 
     def display_opening_name(self):
         """Отображает название текущего дебюта на экране, уменьшая размер текста, если он не помещается."""
         if self.current_opening_name:
             max_width = self.window_width - 20  # Максимальная ширина текста (с учетом отступов)
-            font_size = 32  # Начальный размер шрифта
-            font = pygame.font.Font(self.font_family, font_size)
-
-            # Уменьшаем размер шрифта, пока текст не помещается в допустимую ширину
-            while font.size(self.current_opening_name)[0] > max_width and font_size > 1:
-                font_size -= 1
-                font = pygame.font.Font(self.font_family, font_size)
 
-            # Отрисовка текста
-            text_surface = font.render(self.current_opening_name, True, (0, 0, 0))
+            # Размер шрифта (не больше 32) подбирается под ширину один раз для каждого названия
+            text_surface = fonts.fit_text(self.font_family, self.current_opening_name, max_width, 32)
             text_rect = text_surface.get_rect(midleft=(10, self.extra_space // 2))
             self.screen.blit(text_surface, text_rect)
 
     def undo_move(self):
-        """Откатывает последний ход и синхронизирует состояние доски."""
-        if self.current_move_index >= 0:
-            self.current_move_index -= 1
-
-            # Пересоздаём состояние доски из истории
-            self.board = chess.Board()
-            for move in self.move_history[:self.current_move_index + 1]:
-                self.board.push(move)
-
-            self.last_move = self.move_history[self.current_move_index] if self.current_move_index >= 0 else None
+        """Откатывает последний ход."""
+        if self.step_back():
+            self.after_history_move()
             print("Move undone. Current turn:", "White" if self.board.turn == chess.WHITE else "Black")
 
     def redo_move(self):
-        """Выполняет следующий ход из истории и синхронизирует состояние доски."""
-        if self.current_move_index < len(self.move_history) - 1:
-            # Увеличиваем индекс текущего хода
-            self.current_move_index += 1
-
-            # Выполняем ход
-            move = self.move_history[self.current_move_index]
-            self.board.push(move)
-
-            # Обновляем последний ход
-            self.last_move = move
-
-            # Проверка состояния очереди (обновляем очередь)
-            print("Move redone. Current turn:", "White" if self.board.turn == chess.WHITE else "Black")
\ No newline at end of file
+        """Выполняет следующий ход из истории."""
+        if self.step_forward():
+            self.after_history_move()
+            print("Move redone. Current turn:", "White" if self.board.turn == chess.WHITE else "Black")
+
+    def last_ply(self):
+        """Число полуходов в истории, включая отмененные."""
+        return len(self.board.move_stack) + len(self.redo_stack)
+
+    def go_to_ply(self, ply):
+        """Переходит к позиции после ply полуходов истории (0 - начальная позиция)."""
+        ply = max(0, min(ply, self.last_ply()))
+        if ply == len(self.board.move_stack):
+            return
+        while len(self.board.move_stack) > ply:
+            self.step_back()
+        while len(self.board.move_stack) < ply:
+            self.step_forward()
+        self.after_history_move()
+
+    def step_back(self):
+        """Снимает последний ход с доски в стек для повтора. Возвращает False, если ходов нет."""
+        if not self.board.move_stack:
+            return False
+        self.cancel_bot_search()
+        self.redo_stack.append(self.board.pop())
+        return True
+
+    def step_forward(self):
+        """Повторяет последний отмененный ход. Возвращает False, если повторять нечего."""
+        if not self.redo_stack:
+            return False
+        self.cancel_bot_search()
+        self.board.push(self.redo_stack.pop())
+        return True
+
+    def after_history_move(self):
+        """Обновляет состояние игры после перемещения по истории."""
+        self.legal_moves = None
+        self.last_move = self.board.peek() if self.board.move_stack else None
+        self.update_opening()
\ No newline at end of file
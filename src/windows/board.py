@@ -5,71 +5,187 @@ import chess
 COLORS = ['w', 'b']
 PIECES = ['P', 'N', 'B', 'R', 'Q', 'K']
 
-def load_images():
-    '''Загрузка изображений фигур на доске'''
+SQUARE_COLORS = [(252, 252, 252), (181, 181, 181)]  # Белый и серый в RGB
+HIGHLIGHT_COLOR = (255, 255, 0, 160)  # Желтый с альфа-каналом
+AVAILABLE_MOVE_COLOR = (0, 255, 0, 160)  # Зеленый с альфа-каналом
+
+def load_images(square_size=None):
+    '''
+    Загрузка изображений фигур на доске.
+    Вызывать после pygame.display.set_mode: изображения переводятся в формат экрана.
+    :param square_size: Размер клетки; если задан, фигуры масштабируются под него.
+    '''
     images = {}
     for color in COLORS:
         for piece in PIECES:
-            images[color + piece] = pygame.image.load(f'assets/images/pieces/wikipedia/{color}{piece}.png')
+            image = pygame.image.load(f'assets/images/pieces/wikipedia/{color}{piece}.png').convert_alpha()
+            if square_size and image.get_size() != (square_size, square_size):
+                image = pygame.transform.smoothscale(image, (square_size, square_size))
+            images[color + piece] = image
     return images
 
-def draw_board(screen, board, dragging_piece, mouse_pos, flip_board=False, last_move=None):
-    """Отрисовка доски с подсветкой последнего хода, доступных ходов и перетаскиванием фигуры."""
-    images = load_images()
-    colors = [(252, 252, 252), (181, 181, 181)]  # Белый и серый в RGB
-    highlight_color = (255, 255, 0, 160)  # Желтый с альфа-каналом
-    available_move_color = (0, 255, 0, 160)  # Зеленый с альфа-каналом
-
-    square_size = screen.get_width() // 8
-
-    # Создаем временную поверхность для подсветки с поддержкой альфа-канала
-    highlight_surface = pygame.Surface((square_size, square_size), pygame.SRCALPHA)
-
-    available_moves = []
-    if dragging_piece:
-        piece_square = dragging_piece[0]
-        available_moves = [move.to_square for move in board.legal_moves if move.from_square == piece_square]
-
-    for row in range(8):
-        for col in range(8):
-            # Если доска перевернута, строки и столбцы должны отображаться зеркально
-            display_row = 7 - row if flip_board else row
-            display_col = 7 - col if flip_board else col
-
-            # Определение цвета клетки
-            color = colors[(row + col) % 2]
-
-            pygame.draw.rect(screen, color, pygame.Rect(display_col * square_size, display_row * square_size + 50, square_size, square_size))
-
-            # Подсветка клеток последнего хода
-            if last_move:
-                if chess.square(col, 7 - row) in (last_move.from_square, last_move.to_square):
-                    highlight_surface.fill(highlight_color)
-                    screen.blit(highlight_surface, (display_col * square_size, display_row * square_size + 50))
-
-            # Подсветка доступных клеток
-            if chess.square(col, 7 - row) in available_moves:
-                highlight_surface.fill(available_move_color)
-                screen.blit(highlight_surface, (display_col * square_size, display_row * square_size + 50))
-
-            # Отображение фигуры
-            piece = board.piece_at(chess.square(col, 7 - row))
-            if piece:
-                piece_color = 'w' if piece.color == chess.WHITE else 'b'
-                piece_type = piece.symbol().upper()
-                if dragging_piece and dragging_piece[0] == chess.square(col, 7 - row):
-                    continue  # Не рисуем фигуру на старой позиции, если она перетаскивается
-                piece_image = images[piece_color + piece_type]
-                piece_rect = piece_image.get_rect(center=(display_col * square_size + square_size // 2, display_row * square_size + square_size // 2 + 50))
-                screen.blit(piece_image, piece_rect)
-
-    # Рисуем перетаскиваемую фигуру
-    if dragging_piece:
-        piece_color, piece_type = dragging_piece[1]
-        piece_image = images[piece_color + piece_type]
-        piece_rect = piece_image.get_rect(center=(mouse_pos[0], mouse_pos[1]))
-        screen.blit(piece_image, piece_rect)
-
-
-# Добавляем вызов обновления доступных ходов в метод handle_mouse_button_down
-
+def legal_move_index(board):
+    """
+    Легальные ходы позиции по полям: {откуда: {куда: (ходы,)}}.
+    Несколько ходов на одну пару полей бывает только у превращения пешки.
+    """
+    index = {}
+    for move in board.legal_moves:
+        targets = index.setdefault(move.from_square, {})
+        targets[move.to_square] = targets.get(move.to_square, ()) + (move,)
+    return index
+
+class BoardRenderer:
+    """
+    Отрисовка доски. Изображения фигур загружаются и масштабируются один раз,
+    клетки доски для обеих ориентаций рисуются заранее на отдельных поверхностях;
+    в каждом кадре на фон накладываются только подсветка и фигуры.
+    Запоминает состояние последнего кадра, чтобы перерисовывать только изменившиеся клетки.
+    """
+
+    def __init__(self, square_size, offset_y=50):
+        self.square_size = square_size
+        self.offset_y = offset_y  # Отступ сверху под название позиции
+        self.board_rect = pygame.Rect(0, offset_y, square_size * 8, square_size * 8)
+        self.images = None        # Загружаются при первой отрисовке, когда окно уже создано
+        self.backgrounds = {}     # Фон доски для каждой ориентации
+        self.previous = None      # Состояние последнего нарисованного кадра
+
+        # Поверхности подсветки с поддержкой альфа-канала
+        self.highlight_surface = pygame.Surface((square_size, square_size), pygame.SRCALPHA)
+        self.highlight_surface.fill(HIGHLIGHT_COLOR)
+        self.available_move_surface = pygame.Surface((square_size, square_size), pygame.SRCALPHA)
+        self.available_move_surface.fill(AVAILABLE_MOVE_COLOR)
+
+    def get_background(self, flip_board):
+        """Возвращает заранее нарисованные клетки доски для нужной ориентации."""
+        background = self.backgrounds.get(flip_board)
+        if background is None:
+            size = self.square_size
+            background = pygame.Surface((size * 8, size * 8)).convert()
+            for row in range(8):
+                for col in range(8):
+                    display_row = 7 - row if flip_board else row
+                    display_col = 7 - col if flip_board else col
+                    pygame.draw.rect(background, SQUARE_COLORS[(row + col) % 2],
+                                     pygame.Rect(display_col * size, display_row * size, size, size))
+            self.backgrounds[flip_board] = background
+        return background
+
+    def square_position(self, square, flip_board):
+        """Левый верхний угол клетки на экране."""
+        col, row = chess.square_file(square), 7 - chess.square_rank(square)
+        if flip_board:
+            col, row = 7 - col, 7 - row
+        return col * self.square_size, row * self.square_size + self.offset_y
+
+    def squares_under(self, rect, flip_board):
+        """Клетки доски, которые задевает прямоугольник на экране."""
+        area = rect.clip(self.board_rect)
+        if not area.width or not area.height:
+            return set()
+        size = self.square_size
+        squares = set()
+        for display_row in range((area.top - self.offset_y) // size, (area.bottom - 1 - self.offset_y) // size + 1):
+            for display_col in range(area.left // size, (area.right - 1) // size + 1):
+                col, row = (7 - display_col, display_row) if flip_board else (display_col, 7 - display_row)
+                squares.add(chess.square(col, row))
+        return squares
+
+    def frame_state(self, board, dragging_piece, mouse_pos, flip_board, last_move, legal_moves=None):
+        """
+        Все, от чего зависит изображение доски в кадре.
+        :param legal_moves: Индекс легальных ходов позиции (legal_move_index); если не передан, строится заново.
+        """
+        if self.images is None:
+            self.images = load_images(self.square_size)
+        drag_square = drag_rect = None
+        targets = set()
+        if dragging_piece:
+            drag_square = dragging_piece[0]
+            if legal_moves is None:
+                legal_moves = legal_move_index(board)
+            targets = set(legal_moves.get(drag_square, ()))
+            piece_color, piece_type = dragging_piece[1]
+            drag_rect = self.images[piece_color + piece_type].get_rect(center=(mouse_pos[0], mouse_pos[1]))
+        return {
+            'pieces': board.piece_map(),
+            'highlights': {last_move.from_square, last_move.to_square} if last_move else set(),
+            'targets': targets,
+            'dragging_piece': dragging_piece,
+            'drag_square': drag_square,
+            'drag_rect': drag_rect,
+            'flip_board': flip_board,
+        }
+
+    def draw_square(self, screen, square, state):
+        """Рисует одну клетку: фон, подсветку и фигуру."""
+        x, y = self.square_position(square, state['flip_board'])
+        size = self.square_size
+        screen.blit(self.get_background(state['flip_board']), (x, y),
+                    pygame.Rect(x, y - self.offset_y, size, size))
+
+        # Подсветка клеток последнего хода и доступных клеток
+        if square in state['highlights']:
+            screen.blit(self.highlight_surface, (x, y))
+        if square in state['targets']:
+            screen.blit(self.available_move_surface, (x, y))
+
+        piece = state['pieces'].get(square)
+        if piece and square != state['drag_square']:  # Перетаскиваемая фигура рисуется под курсором
+            piece_image = self.images[('w' if piece.color == chess.WHITE else 'b') + piece.symbol().upper()]
+            half = size // 2
+            screen.blit(piece_image, piece_image.get_rect(center=(x + half, y + half)))
+
+    def draw_dragging_piece(self, screen, state):
+        """Рисует перетаскиваемую фигуру поверх доски."""
+        if state['dragging_piece']:
+            piece_color, piece_type = state['dragging_piece'][1]
+            screen.set_clip(self.board_rect)  # Фигура не заходит на строку с названием позиции
+            screen.blit(self.images[piece_color + piece_type], state['drag_rect'])
+            screen.set_clip(None)
+
+    def draw(self, screen, board, dragging_piece, mouse_pos, flip_board=False, last_move=None, legal_moves=None):
+        """Отрисовка доски с подсветкой последнего хода, доступных ходов и перетаскиванием фигуры."""
+        state = self.frame_state(board, dragging_piece, mouse_pos, flip_board, last_move, legal_moves)
+        screen.blit(self.get_background(flip_board), self.board_rect)
+        for square in state['pieces'].keys() | state['highlights'] | state['targets']:
+            self.draw_square(screen, square, state)
+        self.draw_dragging_piece(screen, state)
+        self.previous = state
+
+    def draw_changes(self, screen, board, dragging_piece, mouse_pos, flip_board=False, last_move=None, legal_moves=None):
+        """
+        Перерисовывает только клетки, изменившиеся с прошлого кадра.
+        :return: Список прямоугольников экрана для pygame.display.update (пустой, если ничего не изменилось).
+        """
+        previous = self.previous
+        if previous is None or previous['flip_board'] != flip_board:
+            self.draw(screen, board, dragging_piece, mouse_pos, flip_board, last_move, legal_moves)
+            return [self.board_rect]
+
+        state = self.frame_state(board, dragging_piece, mouse_pos, flip_board, last_move, legal_moves)
+        old_pieces, new_pieces = previous['pieces'], state['pieces']
+        dirty = {square for square in old_pieces.keys() | new_pieces.keys()
+                 if old_pieces.get(square) != new_pieces.get(square)}
+        dirty |= previous['highlights'] ^ state['highlights']
+        dirty |= previous['targets'] ^ state['targets']
+        if previous['drag_square'] != state['drag_square']:
+            dirty |= {square for square in (previous['drag_square'], state['drag_square']) if square is not None}
+
+        rects = []
+        if previous['drag_rect'] != state['drag_rect'] or previous['dragging_piece'] != state['dragging_piece']:
+            for drag_rect in (previous['drag_rect'], state['drag_rect']):
+                if drag_rect is not None:
+                    dirty |= self.squares_under(drag_rect, flip_board)
+        if not dirty:
+            self.previous = state
+            return rects
+
+        for square in dirty:
+            self.draw_square(screen, square, state)
+            rects.append(pygame.Rect(self.square_position(square, flip_board), (self.square_size, self.square_size)))
+        if state['drag_rect'] is not None and state['drag_rect'].collidelist(rects) != -1:
+            self.draw_dragging_piece(screen, state)
+        self.previous = state
+        return rects
@@ -1,5 +1,6 @@
 import pygame
 import chess
+from src.windows import fonts
 
 def open(screen, font_family, language='EN'):
     # Получаем размеры экрана
@@ -35,16 +36,16 @@ def open(screen, font_family, language='EN'):
     # Выбираем тексты на основе языка
     selected_texts = texts.get(language, texts['EN'])
 
-    # Инициализация шрифта
-    font = pygame.font.Font(font_family, screen_width // 15)
-    hint_font = pygame.font.Font(font_family, screen_width // 20)
+    # Размеры шрифта
+    font_size = screen_width // 15
+    hint_font_size = screen_width // 20
 
     choosing = True
     while choosing:
         screen.fill((255, 255, 255))  # Белый фон
 
         # Подсказка пользователю
-        hint_text = hint_font.render(selected_texts['hint'], True, (0, 0, 0))
+        hint_text = fonts.render_text(font_family, hint_font_size, selected_texts['hint'])
         hint_text_rect = hint_text.get_rect(center=(screen_width // 2, screen_height // 4))
         screen.blit(hint_text, hint_text_rect)
 
@@ -53,8 +54,8 @@ def open(screen, font_family, language='EN'):
         pygame.draw.rect(screen, (100, 100, 100), black_button)
 
         # Текст на кнопках
-        white_text = font.render(selected_texts['white'], True, (0, 0, 0))
-        black_text = font.render(selected_texts['black'], True, (255, 255, 255))
+        white_text = fonts.render_text(font_family, font_size, selected_texts['white'])
+        black_text = fonts.render_text(font_family, font_size, selected_texts['black'], (255, 255, 255))
 
         # Получаем прямоугольники текста и центрируем их в пределах кнопок
         white_text_rect = white_text.get_rect(center=white_button.center)
@@ -0,0 +1,47 @@
+# fonts.py
+import pygame
+from collections import OrderedDict
+
+MAX_TEXT_SURFACES = 256  # Сколько отрисованных надписей хранить
+
+_fonts = {}                # (путь, размер) -> pygame.font.Font
+_texts = OrderedDict()     # Ключ надписи -> поверхность, порядок - давность использования
+
+def get_font(font_family, size):
+    """Шрифт из кеша: файл шрифта читается один раз для каждого размера."""
+    font = _fonts.get((font_family, size))
+    if font is None:
+        font = _fonts[(font_family, size)] = pygame.font.Font(font_family, size)
+    return font
+
+def _cached_text(key, render):
+    surface = _texts.get(key)
+    if surface is not None:
+        _texts.move_to_end(key)
+        return surface
+    surface = _texts[key] = render()
+    if len(_texts) > MAX_TEXT_SURFACES:
+        _texts.popitem(last=False)
+    return surface
+
+def render_text(font_family, size, text, color=(0, 0, 0)):
+    """Отрисованная надпись из кеша."""
+    return _cached_text((font_family, size, text, color),
+                        lambda: get_font(font_family, size).render(text, True, color))
+
+def fit_text(font_family, text, max_width, max_size, color=(0, 0, 0)):
+    """
+    Надпись наибольшим размером шрифта (не больше max_size), при котором она помещается в max_width.
+    Размер подбирается один раз для каждой надписи.
+    """
+    def render():
+        # Двоичный поиск наибольшего подходящего размера; размер 1 используется, даже если не помещается
+        low, high = 1, max_size
+        while low < high:
+            size = (low + high + 1) // 2
+            if get_font(font_family, size).size(text)[0] <= max_width:
+                low = size
+            else:
+                high = size - 1
+        return render_text(font_family, low, text, color)
+    return _cached_text((font_family, text, max_width, max_size, color), render)
@@ -1,5 +1,6 @@
 import pygame
 import chess
+from src.windows import fonts
 
 def open(screen, font_family, language):
     # Тексты для кнопок в зависимости от языка
@@ -16,7 +17,6 @@ def open(screen, font_family, language):
     screen_width, screen_height = screen.get_size()
 
     # Окно для выбора фигуры для превращения пешки
-    font = pygame.font.Font(font_family, 50)
     option_rects = []
 
     # Вычисляем положение кнопок
@@ -36,7 +36,7 @@ def open(screen, font_family, language):
 
         for i, (text, _) in enumerate(options):
             pygame.draw.rect(screen, (200, 200, 200), option_rects[i])
-            option_text = font.render(text, True, (0, 0, 0))
+            option_text = fonts.render_text(font_family, 50, text)
             option_text_rect = option_text.get_rect(center=option_rects[i].center)
             screen.blit(option_text, option_text_rect)
 
@@ -0,0 +1,94 @@
+import os
+import chess
+import pytest
+from src.db.new.database import ChessDatabase
+from src.db.new.compiled_openings import CompiledOpenings, compile_openings
+
+LINES = [
+    ("Italian Game", "Итальянская партия", None, "e2e4,e7e5,g1f3,b8c6,f1c4"),
+    ("Italian Game", "Итальянская партия", ("Giuoco Piano", "Джуоко Пиано"), "e2e4,e7e5,g1f3,b8c6,f1c4,f8c5"),
+    ("Sicilian Defense", "Сицилианская защита", None, "e2e4,c7c5"),
+    ("Queen's Pawn Game", "Ферзевая пешка", None, "d2d4"),
+]
+
+
+def line_fen(moves):
+    board = chess.Board()
+    for move in moves.split(','):
+        board.push_uci(move)
+    return board.fen()
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = ChessDatabase(str(tmp_path / 'openings.db'))
+    for name_en, name_ru, variation, moves in LINES:
+        if not db.execute_query('SELECT 1 FROM OpeningsMain WHERE name_en = ?', (name_en,), fetchone=True):
+            db.create_opening(name_en, name_ru)
+        opening_id = db.execute_query('SELECT id FROM OpeningsMain WHERE name_en = ?', (name_en,), fetchone=True)[0]
+        variation_id = None
+        if variation:
+            db.create_variation(*variation)
+            variation_id = db.execute_query('SELECT id FROM OpeningVariations WHERE variation_name_en = ?',
+                                            (variation[0],), fetchone=True)[0]
+        db.create_opening_record(opening_id, variation_id, moves, line_fen(moves))
+    # Та же позиция, что у Sicilian Defense, с другими счетчиками ходов и названием
+    fen = ' '.join(line_fen("e2e4,c7c5").split()[:4] + ['4', '9'])
+    db.create_opening("Transposed", "Перестановка")
+    db.create_opening_record(db.execute_query("SELECT id FROM OpeningsMain WHERE name_en = 'Transposed'",
+                                              fetchone=True)[0], None, "g1f3,c7c5,e2e4", fen)
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def compiled(db, tmp_path):
+    path = str(tmp_path / 'openings.compiled')
+    assert compile_openings(db, path) == len(LINES) + 1
+    compiled = CompiledOpenings(path)
+    yield compiled
+    compiled.close()
+
+
+def test_lookup_matches_database(db, compiled):
+    fens = [line_fen(moves) for _, _, _, moves in LINES]
+    fens += [' '.join(fen.split()[:4] + ['0', '40']) for fen in fens]  # Другие счетчики ходов
+    fens.append(' '.join(line_fen("e2e4,c7c5").split()[:4] + ['4', '9']))
+    for fen in fens:
+        for language in ('EN', 'RU'):
+            assert compiled.get_full_opening_name_by_fen(fen, language) == \
+                db.get_full_opening_name_by_fen(fen, language)
+    assert compiled.get_full_opening_name_by_fen(line_fen(LINES[1][3]), 'RU') == 'Итальянская партия: Джуоко Пиано'
+    assert compiled.get_full_opening_name_by_fen(fens[-1]) == 'Transposed'
+
+
+def test_missing_position(compiled):
+    assert compiled.find(chess.STARTING_FEN) is None
+    assert compiled.get_moves(chess.STARTING_FEN) is None
+    assert compiled.get_full_opening_name_by_fen(chess.STARTING_FEN) == 'Unknown Position'
+    assert compiled.get_full_opening_name_by_fen(chess.STARTING_FEN, 'RU') == 'Неизвестная позиция'
+
+
+def test_moves_and_lines(compiled):
+    assert compiled.get_moves(line_fen("d2d4")) == ['d2d4']
+    assert compiled.lines()[:len(LINES)] == [moves.split(',') for _, _, _, moves in LINES]
+    assert len(compiled) == len(LINES) + 1
+
+
+def test_stale_file(db, compiled):
+    assert CompiledOpenings.is_current(compiled.path, db.db_path)
+    assert CompiledOpenings.is_current(compiled.path, db.db_path + '.missing')  # Игра без базы
+    db.create_opening("Added Later", "Добавлен позже")
+    db.close()  # Изменения переносятся из журнала -wal в файл базы
+    stat = os.stat(db.db_path)
+    os.utime(db.db_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert not CompiledOpenings.is_current(compiled.path, db.db_path)
+    assert not CompiledOpenings.is_current(compiled.path + '.missing', db.db_path)
+
+
+def test_invalid_file(tmp_path):
+    path = tmp_path / 'broken.compiled'
+    path.write_bytes(b'not a compiled file')
+    with pytest.raises(ValueError):
+        CompiledOpenings(str(path))
+    assert not CompiledOpenings.is_current(str(path), str(tmp_path / 'openings.db'))
@@ -0,0 +1,96 @@
+import sqlite3
+import chess
+import pytest
+from src.db.new.database import ChessDatabase, position_key, migrate_position_keys
+
+ITALIAN = 'r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3'
+
+
+def with_counters(fen, halfmove, fullmove):
+    return ' '.join(fen.split()[:4] + [str(halfmove), str(fullmove)])
+
+
+def test_position_key_ignores_move_counters():
+    assert position_key(ITALIAN) == position_key(with_counters(ITALIAN, 0, 17))
+
+
+def test_position_key_depends_on_position_fields():
+    board = chess.Board(ITALIAN)
+    white_to_move = board.fen().replace(' b ', ' w ')
+    no_castling = board.fen().replace(' KQkq ', ' - ')
+    assert len({position_key(ITALIAN), position_key(white_to_move), position_key(no_castling)}) == 3
+
+
+def test_position_key_keeps_en_passant_only_when_legal():
+    # После 1.e4 взять на проходе нечем: поле e3 не влияет на ключ
+    assert position_key('rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1') == \
+        position_key('rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1')
+    # Черная пешка на d4 может взять e3: это другая позиция
+    assert position_key('rnbqkbnr/ppp1pppp/8/8/3pP3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 3') != \
+        position_key('rnbqkbnr/ppp1pppp/8/8/3pP3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 3')
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = ChessDatabase(str(tmp_path / 'openings.db'))
+    yield db
+    db.close()
+
+
+def add_record(db, name_en, name_ru, variation, fen, move='e2e4'):
+    db.create_opening(name_en, name_ru)
+    opening_id = db.execute_query('SELECT id FROM OpeningsMain WHERE name_en = ?', (name_en,), fetchone=True)[0]
+    variation_id = None
+    if variation:
+        db.create_variation(*variation)
+        variation_id = db.execute_query('SELECT id FROM OpeningVariations WHERE variation_name_en = ?',
+                                        (variation[0],), fetchone=True)[0]
+    db.create_opening_record(opening_id, variation_id, move, fen)
+
+
+def test_lookup_by_position_key(db):
+    add_record(db, 'Italian Game', 'Итальянская партия', ('Two Knights', 'Два коня'), ITALIAN)
+    moved = with_counters(ITALIAN, 0, 12)
+    assert db.get_full_opening_name_by_fen(moved) == 'Italian Game: Two Knights'
+    assert db.get_full_opening_name_by_fen(moved, 'RU') == 'Итальянская партия: Два коня'
+    assert db.get_full_opening_name_by_fen(chess.STARTING_FEN) == 'Unknown Position'
+    assert db.get_full_opening_name_by_fen(chess.STARTING_FEN, 'RU') == 'Неизвестная позиция'
+
+
+def test_lookup_prefers_exact_fen(db):
+    add_record(db, 'First', 'Первый', None, ITALIAN)
+    add_record(db, 'Second', 'Второй', None, with_counters(ITALIAN, 5, 9))
+    assert db.get_full_opening_name_by_fen(ITALIAN) == 'First'
+    assert db.get_full_opening_name_by_fen(with_counters(ITALIAN, 5, 9)) == 'Second'
+    assert db.get_full_opening_name_by_fen(with_counters(ITALIAN, 0, 30)) == 'First'
+
+
+def test_backfill_is_idempotent(tmp_path):
+    path = str(tmp_path / 'old.db')
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        CREATE TABLE OpeningsMain (id INTEGER PRIMARY KEY AUTOINCREMENT, name_en TEXT NOT NULL,
+                                   name_ru TEXT NOT NULL, UNIQUE(name_en, name_ru));
+        CREATE TABLE OpeningVariations (id INTEGER PRIMARY KEY AUTOINCREMENT, variation_name_en TEXT NOT NULL,
+                                        variation_name_ru TEXT NOT NULL,
+                                        UNIQUE(variation_name_en, variation_name_ru));
+        CREATE TABLE Openings (id INTEGER PRIMARY KEY AUTOINCREMENT, opening_id INTEGER NOT NULL,
+                               variation_id INTEGER, move TEXT NOT NULL, fen TEXT NOT NULL UNIQUE);
+    ''')
+    fens = [ITALIAN, chess.STARTING_FEN, 'rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1']
+    conn.executemany('INSERT INTO Openings (opening_id, move, fen) VALUES (1, ?, ?)', [('', fen) for fen in fens])
+    conn.commit()
+
+    migrate_position_keys(conn)
+    first = conn.execute('SELECT fen, position_key FROM Openings ORDER BY id').fetchall()
+    changes = conn.total_changes
+    migrate_position_keys(conn)
+    assert conn.execute('SELECT fen, position_key FROM Openings ORDER BY id').fetchall() == first
+    assert conn.total_changes == changes  # Второй запуск ничего не меняет
+    assert [key for _, key in first] == [position_key(fen) for fen in fens]
+    conn.close()
+
+    # Соединение только для чтения видит уже готовую схему
+    db = ChessDatabase(path, read_only=True)
+    assert db.schema_ready()
+    db.close()
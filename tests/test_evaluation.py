@@ -0,0 +1,23 @@
+import random
+import chess
+from src.ai.chessbot import ChessBot
+from src.ai.zobrist import zobrist_hash
+
+GAMES = 20
+MAX_PLIES = 120
+
+
+def test_incremental_evaluation_matches_evaluate_board():
+    bot = ChessBot()
+    rng = random.Random(0)
+    for _ in range(GAMES):
+        board = chess.Board()
+        bot.evaluator.reset(board)
+        key = zobrist_hash(board)
+        for _ in range(MAX_PLIES):
+            if board.is_game_over():
+                break
+            # Ходы через make_move, как в поиске: оценка и ключ обновляются инкрементально
+            key = bot.make_move(board, key, rng.choice(list(board.legal_moves)))
+            assert bot.evaluator.evaluate(board) == bot.evaluate_board(board), board.fen()
+            assert key == zobrist_hash(board), board.fen()
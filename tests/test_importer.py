@@ -0,0 +1,108 @@
+import pytest
+from src.db.new.database import ChessDatabase
+from src.db.new.importer import OpeningImporter, read_epd, read_pgn, read_tsv
+
+PGN = '''[Event "?"]
+[Opening "Italian Game"]
+[Variation "Giuoco Piano"]
+[OpeningRU "Итальянская партия"]
+[VariationRU "Джуоко Пиано"]
+
+1. e4 e5 2. Nf3 Nc6 3. Bc4 Bc5 *
+
+[Event "?"]
+[Opening "Italian Game: Two Knights Defense"]
+
+1. e4 e5 2. Nf3 Nc6 3. Bc4 Nf6 *
+
+[Event "?"]
+
+1. d4 d5 *
+'''
+
+EPD = '''# Позиции с названиями
+rnbqkbnr/pp1ppppp/8/2p5/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - opening "Sicilian Defense";
+rnbqkbnr/pp2pppp/3p4/2p5/4P3/5N2/PPPP1PPP/RNBQKBNR w KQkq - c0 "Sicilian Defense: Modern Variations";
+rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq -
+'''
+
+TSV = '''eco\tname\tpgn
+C50\tItalian Game\t1. e4 e5 2. Nf3 Nc6 3. Bc4
+C53\tItalian Game: Giuoco Piano\t1. e4 e5 2. Nf3 Nc6 3. Bc4 Bc5 4. c3
+C55\tItalian Game: Two Knights Defense\t1. e4 e5 2. Nf3 Nc6 3. Bc4 Nf6
+A00\tBroken Line\t1. e4 e4
+'''
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = ChessDatabase(str(tmp_path / 'openings.db'))
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def files(tmp_path):
+    paths = {}
+    for name, text in (('lines.pgn', PGN), ('positions.epd', EPD), ('lines.tsv', TSV)):
+        path = tmp_path / name
+        path.write_text(text, encoding='utf-8')
+        paths[path.suffix] = str(path)
+    return paths
+
+
+def count(db, table):
+    return db.execute_query(f'SELECT COUNT(*) FROM {table}', fetchone=True)[0]
+
+
+def test_read_pgn(files):
+    lines = list(read_pgn(files['.pgn']))
+    assert [line[:4] for line in lines] == [
+        ('Italian Game', 'Итальянская партия', 'Giuoco Piano', 'Джуоко Пиано'),
+        ('Italian Game', '', 'Two Knights Defense', ''),
+    ]
+    assert [len(line[4]) for line in lines] == [6, 6]
+
+
+def test_read_epd(files):
+    lines = list(read_epd(files['.epd']))
+    assert [line[:4] for line in lines] == [
+        ('Sicilian Defense', '', '', ''),
+        ('Sicilian Defense', '', 'Modern Variations', ''),
+    ]
+    assert all(line[4] == [] and line[5] for line in lines)
+
+
+def test_read_tsv(files):
+    lines = list(read_tsv(files['.tsv']))
+    assert [(line[0], line[2], len(line[4])) for line in lines] == [
+        ('Italian Game', '', 5), ('Italian Game', 'Giuoco Piano', 7), ('Italian Game', 'Two Knights Defense', 6),
+    ]
+
+
+def test_import_deduplicates_across_batches(db, files):
+    importer = OpeningImporter(db)
+    importer.BATCH_SIZE = 1  # Каждая позиция - отдельная пачка
+    importer.import_file(files['.pgn'])
+    importer.import_file(files['.tsv'])
+    stats = importer.import_file(files['.epd'])
+
+    assert stats['inserted'] == 2
+    # Italian Game (PGN с русским названием и TSV без него - разные записи) и Sicilian Defense
+    assert count(db, 'OpeningsMain') == 3
+    # Giuoco Piano (PGN и TSV), Two Knights Defense, Modern Variations
+    assert count(db, 'OpeningVariations') == 4
+    # PGN: 2 позиции; TSV: 3 позиции, одна из них (Two Knights) уже есть; EPD: 2 позиции
+    assert count(db, 'Openings') == 6
+
+    # Повторный импорт ничего не добавляет
+    stats = OpeningImporter(db).import_file(files['.tsv'])
+    assert (stats['inserted'], stats['openings'], stats['variations']) == (0, 0, 0)
+    assert count(db, 'Openings') == 6
+
+
+def test_import_all_positions(db, files):
+    stats = OpeningImporter(db, all_positions=True).import_file(files['.pgn'])
+    # 6 позиций первой линии и 6 второй, из которых 5 общие
+    assert stats['positions'] == 12
+    assert count(db, 'Openings') == 7
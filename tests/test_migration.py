@@ -0,0 +1,130 @@
+import sqlite3
+import chess
+import pytest
+from src.db.migration import ChessDatabaseMigration
+from src.db.new.database import position_key
+
+LINES = [
+    ("King's Pawn Opening", "Королевская пешка", "e2e4"),
+    ("Italian Game", "Итальянская партия", "e2e4,e7e5,g1f3,b8c6,f1c4"),
+    ("Italian Game: Giuoco Piano", "Итальянская партия: Джуоко Пиано", "e2e4,e7e5,g1f3,b8c6,f1c4,f8c5"),
+    ("Sicilian Defense", "Сицилианская защита", "e2e4,c7c5"),
+    ("Sicilian Defense: Open", "Сицилианская защита: Открытый вариант", "e2e4,c7c5,g1f3,d7d6,d2d4"),
+]
+
+# Схема новой базы до появления position_key (как в исходной chess_openings.db)
+OLD_TARGET_SCHEMA = '''
+    CREATE TABLE OpeningsMain (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name_en TEXT NOT NULL,
+        name_ru TEXT NOT NULL,
+        UNIQUE(name_en, name_ru)
+    );
+    CREATE TABLE OpeningVariations (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        variation_name_en TEXT NOT NULL,
+        variation_name_ru TEXT NOT NULL,
+        UNIQUE(variation_name_en, variation_name_ru)
+    );
+    CREATE TABLE Openings (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        opening_id INTEGER NOT NULL,
+        variation_id INTEGER,
+        move TEXT NOT NULL,
+        fen TEXT NOT NULL UNIQUE,
+        FOREIGN KEY (opening_id) REFERENCES OpeningsMain (id),
+        FOREIGN KEY (variation_id) REFERENCES OpeningVariations (id)
+    );
+'''
+
+
+def line_fen(moves):
+    board = chess.Board()
+    for move in moves.split(','):
+        board.push_uci(move)
+    return board.fen()
+
+
+@pytest.fixture
+def old_db(tmp_path):
+    path = str(tmp_path / 'old.db')
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE Openings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name_en TEXT NOT NULL,
+            name_ru TEXT NOT NULL,
+            parents TEXT,
+            move TEXT NOT NULL,
+            fen TEXT NOT NULL
+        )
+    ''')
+    conn.executemany('INSERT INTO Openings (name_en, name_ru, move, fen) VALUES (?, ?, ?, ?)',
+                     [(name_en, name_ru, moves, line_fen(moves)) for name_en, name_ru, moves in LINES])
+    conn.commit()
+    conn.close()
+    return path
+
+
+def migrate(old_path, new_path):
+    migration = ChessDatabaseMigration(old_path, new_path)
+    try:
+        migration.create_new_tables()
+        migration.migrate_data()
+    finally:
+        migration.close()
+
+
+def test_migration_into_database_with_old_schema(old_db, tmp_path):
+    new_path = str(tmp_path / 'new.db')
+    conn = sqlite3.connect(new_path)
+    conn.executescript(OLD_TARGET_SCHEMA)
+    conn.close()
+
+    migrate(old_db, new_path)
+
+    conn = sqlite3.connect(new_path)
+    rows = conn.execute('SELECT fen, position_key FROM Openings').fetchall()
+    indexes = [row[1] for row in conn.execute('PRAGMA index_list(Openings)')]
+    conn.close()
+    assert len(rows) == len(LINES)
+    assert all(key == position_key(fen) for fen, key in rows)
+    assert 'idx_openings_position_key' in indexes
+
+
+def test_interrupted_migration_resumes_from_checkpoint(old_db, tmp_path, monkeypatch):
+    new_path = str(tmp_path / 'new.db')
+    migration = ChessDatabaseMigration(old_db, new_path)
+    migration.BATCH_SIZE = 2
+    migration.create_new_tables()
+    journal_mode = migration.new_conn.execute('PRAGMA journal_mode').fetchone()[0]
+    synchronous = migration.new_conn.execute('PRAGMA synchronous').fetchone()[0]
+
+    # Сбой на пятой строке: первые две пачки уже зафиксированы, третья откатывается
+    calls = []
+
+    def failing_position_key(fen):
+        calls.append(fen)
+        if len(calls) == 5:
+            raise RuntimeError("сбой миграции")
+        return position_key(fen)
+
+    monkeypatch.setattr('src.db.migration.position_key', failing_position_key)
+    with pytest.raises(RuntimeError):
+        migration.migrate_data()
+    assert migration.new_conn.execute('PRAGMA journal_mode').fetchone()[0] == journal_mode
+    assert migration.new_conn.execute('PRAGMA synchronous').fetchone()[0] == synchronous
+    assert migration.new_conn.execute('SELECT last_id FROM MigrationState').fetchone()[0] == 4
+    assert migration.new_conn.execute('SELECT COUNT(*) FROM Openings').fetchone()[0] == 4
+    migration.close()
+
+    monkeypatch.undo()
+    migrate(old_db, new_path)
+    conn = sqlite3.connect(new_path)
+    assert conn.execute('SELECT COUNT(*) FROM Openings').fetchone()[0] == len(LINES)
+    assert conn.execute('SELECT last_id FROM MigrationState').fetchone()[0] == len(LINES)
+    # Дебюты и варианты, созданные до сбоя, не дублируются
+    assert conn.execute('SELECT COUNT(*) FROM OpeningsMain').fetchone()[0] == 3
+    assert conn.execute('SELECT COUNT(*) FROM OpeningVariations').fetchone()[0] == 2
+    assert conn.execute('PRAGMA journal_mode').fetchone()[0] == journal_mode
+    conn.close()
@@ -0,0 +1,29 @@
+import math
+import chess
+from src.ai.parallel import _init_worker, root_split_search
+
+POSITION = 'r1bqk2r/pppp1ppp/2n2n2/2b1p3/2B1P3/2NP1N2/PPP2PPP/R1BQK2R w KQkq - 0 5'
+OTHER_POSITIONS = [
+    'rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1',
+    'r2q1rk1/ppp2ppp/2np1n2/2b1p1B1/2B1P1b1/2NP1N2/PPP2PPP/R2Q1RK1 w - - 6 8',
+]
+DEPTH = 3
+
+
+def search(fen):
+    board = chess.Board(fen)
+    results, _ = root_split_search(board, list(board.legal_moves), DEPTH, -math.inf, None)
+    return results
+
+
+def test_root_split_task_does_not_depend_on_previous_tasks():
+    # Задача root_split в процессе, который еще ничего не искал
+    _init_worker(DEPTH, None, 1, None)
+    fresh = search(POSITION)
+
+    # Та же задача в том же процессе после других задач
+    for fen in OTHER_POSITIONS:
+        search(fen)
+    reused = search(POSITION)
+
+    assert fresh == reused
@@ -0,0 +1,59 @@
+import random
+import chess
+import pytest
+from src.ai.evaluation import PIECE_VALUES
+from src.ai.see import attackers_to, captured_value, see
+
+
+def reference_see(board, move):
+    """Перебор размена без отсечений: каждая сторона бьет самой дешевой фигурой или останавливается."""
+    square = move.to_square
+    gain = captured_value(board, move)
+    on_square = PIECE_VALUES[board.piece_type_at(move.from_square)]
+    if move.promotion:
+        gain += PIECE_VALUES[move.promotion] - PIECE_VALUES[chess.PAWN]
+        on_square = PIECE_VALUES[move.promotion]
+    occupied = board.occupied & ~chess.BB_SQUARES[move.from_square]
+    if board.is_en_passant(move):
+        occupied &= ~chess.BB_SQUARES[square + (-8 if board.turn == chess.WHITE else 8)]
+
+    def swap(occupied, on_square, side):
+        attackers = attackers_to(board, square, occupied)
+        own_attackers = attackers & board.occupied_co[side]
+        if not own_attackers:
+            return 0
+        for attacker_type in chess.PIECE_TYPES:
+            candidates = own_attackers & board.pieces_mask(attacker_type, side)
+            if candidates:
+                break
+        if attacker_type == chess.KING and attackers & board.occupied_co[not side]:
+            return 0
+        occupied &= ~chess.BB_SQUARES[chess.lsb(candidates)]
+        return max(0, on_square - swap(occupied, PIECE_VALUES[attacker_type], not side))
+
+    return gain - swap(occupied, on_square, not board.turn)
+
+
+@pytest.mark.parametrize('fen, uci, expected', [
+    ('1k1r3q/1ppn3p/p4b2/4p3/8/P2N2P1/1PP1R1BP/2K1Q3 w - - 0 1', 'd3e5', -220),
+    ('rn3qnr/6k1/p2pp2p/4NPp1/1P1PP2P/2p1K3/5P2/R1B2B1R w - - 0 21', 'a1a6', -400),
+])
+def test_see_value_of_losing_capture(fen, uci, expected):
+    board = chess.Board(fen)
+    move = chess.Move.from_uci(uci)
+    assert see(board, move) == reference_see(board, move) == expected
+
+
+def test_see_matches_exhaustive_exchange():
+    rng = random.Random(0)
+    checked = 0
+    for _ in range(60):
+        board = chess.Board()
+        for _ in range(80):
+            if board.is_game_over():
+                break
+            for move in board.generate_legal_captures():
+                assert see(board, move) == reference_see(board, move), (board.fen(), move.uci())
+                checked += 1
+            board.push(rng.choice(list(board.legal_moves)))
+    assert checked > 500
@@ -0,0 +1,81 @@
+import chess
+import pytest
+from src.ai.transposition import TranspositionTable, EXACT, LOWER, UPPER
+
+KEY = 0x9D39247E33776D41
+
+
+@pytest.fixture
+def table():
+    table = TranspositionTable(size_mb=1)
+    yield table
+    table.close()
+
+
+@pytest.mark.parametrize('score, depth, flag, move', [
+    (0, 0, EXACT, None),
+    (35, 4, LOWER, chess.Move.from_uci('e2e4')),
+    (-120, 7, UPPER, chess.Move.from_uci('g8f6')),
+    (-9999, 255, EXACT, chess.Move.from_uci('a7a8q')),
+    (9999, 12, LOWER, chess.Move.from_uci('h2h1n')),
+])
+def test_store_and_probe_round_trip(table, score, depth, flag, move):
+    table.new_search()
+    table.store(KEY, depth, score, flag, move)
+    assert table.probe(KEY) == (score, depth, flag, move)
+    assert table.data[KEY & table.mask] >> 58 == table.age
+
+
+def test_probe_other_key_misses(table):
+    table.store(KEY, 3, 10, EXACT, None)
+    assert table.probe(KEY + table.size) is None  # Тот же индекс, другой ключ
+
+
+def test_torn_entry_is_rejected(table):
+    # Ключ одной записи и данные другой с тем же индексом - как при одновременной записи двух процессов
+    other_key = KEY + table.size
+    index = KEY & table.mask
+    table.store(KEY, 3, 10, EXACT, chess.Move.from_uci('e2e4'))
+    key_word = table.keys[index]
+    table.store(other_key, 5, -40, LOWER, chess.Move.from_uci('d2d4'))
+    table.keys[index] = key_word
+    assert table.probe(KEY) is None
+    assert table.probe(other_key) is None
+
+
+def test_same_search_keeps_deeper_entry(table):
+    other_key = KEY + table.size
+    table.store(KEY, 6, 10, EXACT, None)
+    table.store(other_key, 2, 20, EXACT, None)
+    assert table.probe(KEY) == (10, 6, EXACT, None)
+    assert table.probe(other_key) is None
+
+    table.store(other_key, 6, 20, EXACT, None)  # Не меньшая глубина вытесняет
+    assert table.probe(other_key) == (20, 6, EXACT, None)
+
+
+def test_old_search_entry_is_replaced(table):
+    other_key = KEY + table.size
+    table.store(KEY, 6, 10, EXACT, None)
+    table.new_search()
+    table.store(other_key, 1, 20, UPPER, None)
+    assert table.probe(KEY) is None
+    assert table.probe(other_key) == (20, 1, UPPER, None)
+
+
+def test_same_key_keeps_best_move(table):
+    move = chess.Move.from_uci('e2e4')
+    table.store(KEY, 6, 10, LOWER, move)
+    table.store(KEY, 2, 15, UPPER, None)  # Та же позиция: вытесняет даже меньшей глубиной
+    assert table.probe(KEY) == (15, 2, UPPER, move)
+
+
+def test_shared_table_is_visible_by_name():
+    table = TranspositionTable(size_mb=1, shared=True)
+    other = TranspositionTable(size_mb=1, name=table.name)
+    try:
+        table.store(KEY, 4, -25, EXACT, chess.Move.from_uci('g1f3'))
+        assert other.probe(KEY) == (-25, 4, EXACT, chess.Move.from_uci('g1f3'))
+    finally:
+        other.close()
+        table.close()